@@ -0,0 +1,83 @@
+"""
+Benchmark: start-up cost of the module and of the short CLI commands
+
+Runs each case in a fresh interpreter under `python -X importtime`, reports
+the median wall time and the cumulative import time of the heaviest
+modules, and lists which heavy dependencies (pandas, numpy, bs4, lxml,
+pyarrow) each case pulled in.
+
+Usage:
+    python benchmarks/bench_import_time.py [--repeat 5] [--check]
+
+--check exits with status 1 if `import bible_verse_analyzer`, `--help` or
+`stats` imports a heavy dependency, to catch lazy-import regressions.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+MODULE = str(ROOT / 'bible_verse_analyzer.py')
+HEAVY_MODULES = ['pandas', 'numpy', 'bs4', 'lxml', 'pyarrow']
+# 這些情況不應載入任何重量級套件
+LIGHT_CASES = ['import', '--help', 'stats']
+CASES: Dict[str, List[str]] = {
+    'import': ['-c', 'import bible_verse_analyzer'],
+    '--help': [MODULE, '--help'],
+    'stats': [MODULE, 'stats'],
+    'scan --help': [MODULE, 'scan', '--help'],
+}
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_case(args: List[str]) -> Tuple[float, Dict[str, int]]:
+    """
+    Returns: (wall seconds, top-level module -> cumulative import microseconds)
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    imports = {}
+    for match in IMPORT_LINE.finditer(completed.stderr):
+        name = match.group(4)
+        imports[name.split('.')[0]] = max(imports.get(name.split('.')[0], 0), int(match.group(2)))
+    return elapsed, imports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--check', action='store_true', help='fail if a light case imports a heavy dependency')
+    args = parser.parse_args()
+
+    if os.environ.get('PYTHONDONTWRITEBYTECODE'):
+        print("note: PYTHONDONTWRITEBYTECODE is set, so every run also recompiles the module")
+    failures = []
+    print(f"{'case':<14} {'wall (median)':>14} {'module import':>14}  heavy dependencies / slowest imports")
+    for name, case_args in CASES.items():
+        runs = [run_case(case_args) for _ in range(args.repeat)]
+        wall = statistics.median(elapsed for elapsed, _ in runs)
+        imports = runs[-1][1]
+        heavy = [module for module in HEAVY_MODULES if module in imports]
+        own = imports.get('bible_verse_analyzer', 0)
+        slowest = sorted(((us, module) for module, us in imports.items() if module != 'bible_verse_analyzer'),
+                         reverse=True)[:3]
+        detail = ', '.join(heavy) if heavy else 'none; ' + ', '.join(f"{m} {us / 1000:.0f} ms" for us, m in slowest)
+        own_text = f"{own / 1000:.0f} ms" if own else '-'  # 以腳本執行時模組是 __main__
+        print(f"{name:<14} {wall * 1000:>11.0f} ms {own_text:>14}  {detail}")
+        if name in LIGHT_CASES and heavy:
+            failures.append(f"{name} imports {', '.join(heavy)}")
+    if args.check and failures:
+        print('\n'.join(['FAIL: ' + failure for failure in failures]))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
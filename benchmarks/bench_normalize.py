@@ -0,0 +1,118 @@
+"""
+Micro-benchmark: per-match cost of verse normalization
+
+Compares the legacy normalize_verse algorithm (rebuild the book and
+Chinese-numeral tables on every call, sort the numeral table by key length
+and scan both linearly) against the precompiled VerseNormalizer engine.
+
+Usage:
+    python benchmarks/bench_normalize.py [--count 1000000] [--seed 0]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bible_verse_analyzer import BOOK_MAPPING, VerseNormalizer  # noqa: E402
+
+DIGITS = '一二三四五六七八九'
+
+
+def positional_numeral(n: int) -> str:
+    """Write 1..199 the way the legacy table did (十五, 二十三, 一百零三)"""
+    hundreds, rest = divmod(n, 100)
+    tens, ones = divmod(rest, 10)
+    text = ''
+    if hundreds:
+        text += DIGITS[hundreds - 1] + '百'
+        if rest and tens == 0:
+            text += '零'
+    if tens:
+        text += ('' if tens == 1 and not hundreds else DIGITS[tens - 1]) + '十'
+    if ones:
+        text += DIGITS[ones - 1]
+    return text
+
+
+def digitwise_numeral(n: int) -> str:
+    """Write n digit by digit (一一九, 一○○)"""
+    return ''.join('○' if d == '0' else DIGITS[int(d) - 1] for d in str(n))
+
+
+def legacy_numeral_items() -> List[Tuple[str, str]]:
+    """Rebuild the ~300-entry hand-written chapter table of the old code"""
+    items = [(positional_numeral(n), str(n)) for n in range(1, 151)]
+    items += [(digitwise_numeral(n), str(n)) for n in range(21, 151)]
+    items += [('廿' + DIGITS[d - 1], str(20 + d)) for d in range(1, 10)] + [('廿', '20')]
+    items += [('卅' + DIGITS[d - 1], str(30 + d)) for d in range(1, 10)] + [('卅', '30')]
+    return items
+
+
+LEGACY_NUMERAL_ITEMS = legacy_numeral_items()
+BOOK_ITEMS = list(BOOK_MAPPING.items())
+
+
+def legacy_normalize(book: str, chapter: str, verse: str) -> str:
+    """The pre-engine algorithm: per-call table rebuilds and linear scans"""
+    book = book.strip().lower()
+    chapter = chapter.strip().lower()
+    book_mapping: Dict[str, str] = dict(BOOK_ITEMS)
+    booksw = book
+    for key, value in book_mapping.items():
+        if book.startswith(key):
+            booksw = value
+    chinese_numbers = dict(LEGACY_NUMERAL_ITEMS)
+    chaptersw = chapter if chapter != '' else 1
+    for key, value in sorted(chinese_numbers.items(), key=lambda x: len(x[0]), reverse=True):
+        if chapter.startswith(key):
+            chaptersw = value
+            break
+    return f"{booksw} {chaptersw}:{verse}"
+
+
+def synthetic_references(count: int, seed: int) -> List[Tuple[str, str, str]]:
+    """Random ZH (book, chapter, verse) matches as the regex would return them"""
+    rng = random.Random(seed)
+    books = [key for key in BOOK_MAPPING if not key.isascii()]
+    chapters = [positional_numeral(n) for n in range(1, 151)]
+    chapters += [digitwise_numeral(n) for n in range(1, 151)] + [str(n) for n in range(1, 151)]
+    return [(rng.choice(books), rng.choice(chapters), str(rng.randint(1, 40))) for _ in range(count)]
+
+
+def time_per_match(func, references) -> float:
+    start = time.perf_counter()
+    for book, chapter, verse in references:
+        func(book, chapter, verse)
+    return (time.perf_counter() - start) / len(references)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000, help='number of synthetic references')
+    parser.add_argument('--legacy-count', type=int, default=20_000,
+                        help='references timed with the legacy algorithm (it is hundreds of times slower)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    references = synthetic_references(args.count, args.seed)
+
+    build_start = time.perf_counter()
+    normalizer = VerseNormalizer()
+    build_time = time.perf_counter() - build_start
+
+    legacy = time_per_match(legacy_normalize, references[:args.legacy_count])
+    engine = time_per_match(normalizer.normalize, references)
+
+    print(f"references:        {args.count:,} (legacy timed on {min(args.count, args.legacy_count):,})")
+    print(f"engine build time: {build_time * 1e3:.2f} ms (once per process)")
+    print(f"legacy per match:  {legacy * 1e6:.3f} us")
+    print(f"engine per match:  {engine * 1e6:.3f} us")
+    print(f"speedup:           {legacy / engine:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: result output formats
+
+Writes the same synthetic result rows as CSV (the DataFrame and the
+streaming writer) and, via ArrowResultWriter, as Parquet and Feather with
+dictionary-encoded string columns. Reports write time, file size and the
+time pandas needs to read the detail file back.
+
+Usage:
+    python benchmarks/bench_output_formats.py [--rows 1000000] [--files 20000] [--row-group 100000]
+
+Parquet and Feather need pyarrow (pip install pyarrow).
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bible_verse_analyzer import (  # noqa: E402
+    BOOK_ORDER, ArrowResultWriter, DataFrameResultWriter, StreamingResultWriter, summary_file_for,
+)
+
+READERS = {
+    'csv': pd.read_csv,
+    'parquet': pd.read_parquet,
+    'feather': pd.read_feather,
+}
+
+
+def synthetic_rows(rows: int, files: int, persons: int = 3000, seed: int = 0) -> List[List[Dict]]:
+    """Result rows grouped per article, shaped like build_result_rows output"""
+    rng = random.Random(seed)
+    people = [(person_id, f"Person{person_id}", f"人物{person_id}") for person_id in range(1, persons + 1)]
+    per_file = max(1, rows // files)
+    batches = []
+    for index in range(files):
+        html_file = f"Crawler-Persen/ZH/article/{index // 1000:03d}/article_{index:06d}.htm"
+        batch = []
+        for _ in range(per_file):
+            book = rng.choice(BOOK_ORDER)
+            person_id, name, zh_name = rng.choice(people)
+            batch.append({
+                'Verse': f"{book} {rng.randint(1, 50)}:{rng.randint(1, 40)}", 'Book': book,
+                'Count': rng.randint(1, 5), 'PersonID': person_id, 'PersonName': name,
+                'ZhName': zh_name, 'File': html_file,
+            })
+        batches.append(batch)
+    return batches
+
+
+def run_writer(make_writer, batches: List[List[Dict]]):
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        writer = make_writer()
+        for batch in batches:
+            writer.write_rows(batch)
+        writer.close()
+        return writer, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--files', type=int, default=20_000)
+    parser.add_argument('--row-group', type=int, default=100_000)
+    args = parser.parse_args()
+
+    batches = synthetic_rows(args.rows, args.files)
+    print(f"rows: {sum(len(batch) for batch in batches):,} in {len(batches):,} files")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = str(Path(tmp) / 'results.csv')
+        writers = {
+            'csv (DataFrame)': ('csv', lambda: DataFrameResultWriter(base)),
+            'csv (stream)': ('csv', lambda: StreamingResultWriter(base)),
+            'parquet': ('parquet', lambda: ArrowResultWriter(base, 'parquet', args.row_group)),
+            'feather': ('feather', lambda: ArrowResultWriter(base, 'feather', args.row_group)),
+        }
+        print(f"{'':>16} {'write':>9} {'size':>10} {'summary':>10} {'read back':>10}")
+        for name, (output_format, make_writer) in writers.items():
+            try:
+                writer, elapsed = run_writer(make_writer, batches)
+            except ImportError as e:
+                print(f"{name:>16} skipped: {e}")
+                continue
+            path = getattr(writer, 'output_file', base)
+            summary = getattr(writer, 'summary_file', summary_file_for(base))
+            start = time.perf_counter()
+            READERS[output_format](path)
+            read_time = time.perf_counter() - start
+            print(f"{name:>16} {elapsed:>8.2f}s {os.path.getsize(path) / 1e6:>8.1f}MB "
+                  f"{os.path.getsize(summary) / 1e6:>8.1f}MB {read_time:>9.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: PersonVerseMatcher load time and memory
+
+Scales a tPerson.csv up (default 100x, each copy gets fresh PersonIDs) and
+compares the legacy iterrows loader, which stores one person dict per verse
+occurrence, with the vectorized loader (person table + verse -> index arrays).
+Memory is the Python heap retained by the loaded index (and the peak during
+loading), measured with tracemalloc on a second, untimed load.
+
+Usage:
+    python benchmarks/bench_person_loading.py [--tperson tPerson.csv] [--scale 100]
+
+Without --tperson a synthetic file with 3000 persons is used as the 1x input.
+"""
+import argparse
+import contextlib
+import io
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bible_verse_analyzer import BOOK_MAPPING, PersonVerseMatcher  # noqa: E402
+
+
+class LegacyPersonVerseMatcher:
+    """The pre-vectorization loader: iterrows and one dict per verse occurrence"""
+    def __init__(self, tperson_file: str):
+        self.person_verses: Dict[str, List[Dict]] = {}
+        df = pd.read_csv(tperson_file)
+        for _, row in df.iterrows():
+            for verse in str(row['Verses']).split(';'):
+                verse = verse.strip()
+                if verse:
+                    self.person_verses.setdefault(verse, []).append({
+                        'PersonID': row['PersonID'],
+                        'Name': row['Name'],
+                        'ZhName': row['ZhName']
+                    })
+
+
+def synthetic_tperson(persons: int, seed: int = 0) -> pd.DataFrame:
+    rng = random.Random(seed)
+    books = sorted(set(BOOK_MAPPING.values()))
+    rows = []
+    for person_id in range(1, persons + 1):
+        verses = ';'.join(f"{rng.choice(books)} {rng.randint(1, 50)}:{rng.randint(1, 40)}"
+                          for _ in range(rng.randint(1, 30)))
+        rows.append({'PersonID': person_id, 'Name': f"Person{person_id}", 'ZhName': f"人物{person_id}",
+                     'Verses': verses})
+    return pd.DataFrame(rows)
+
+
+def scale_tperson(df: pd.DataFrame, scale: int) -> pd.DataFrame:
+    copies = []
+    for copy in range(scale):
+        scaled = df.copy()
+        scaled['PersonID'] = scaled['PersonID'] + copy * (int(df['PersonID'].max()) + 1)
+        copies.append(scaled)
+    return pd.concat(copies, ignore_index=True)
+
+
+def measure(loader, path: str):
+    """Time one load untraced, then repeat it under tracemalloc for memory"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        loader(path)
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        matcher = loader(path)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return matcher, elapsed, retained, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tperson', help='tPerson.csv used as the 1x input')
+    parser.add_argument('--scale', type=int, default=100)
+    args = parser.parse_args()
+
+    base = pd.read_csv(args.tperson) if args.tperson else synthetic_tperson(3000)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'tPerson_scaled.csv')
+        scale_tperson(base, args.scale).to_csv(path, index=False)
+        print(f"tPerson: {len(base)} rows x {args.scale} = {len(base) * args.scale} rows "
+              f"({Path(path).stat().st_size / 1e6:.1f} MB)")
+
+        legacy, legacy_time, legacy_mem, legacy_peak = measure(LegacyPersonVerseMatcher, path)
+        matcher, new_time, new_mem, new_peak = measure(PersonVerseMatcher, path)
+
+    sample = list(legacy.person_verses)[:100]
+    assert all([dict(p) for p in legacy.person_verses[v]] == matcher.find_matching_persons(v) for v in sample)
+    print(f"{'':>12} {'load time':>10} {'retained':>12} {'peak':>12}")
+    for name, elapsed, retained, peak in [('legacy', legacy_time, legacy_mem, legacy_peak),
+                                          ('vectorized', new_time, new_mem, new_peak)]:
+        print(f"{name:>12} {elapsed:>9.2f}s {retained / 1e6:>10.1f}MB {peak / 1e6:>10.1f}MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+Load test: latency and throughput of the verse_service HTTP service
+
+Sends synthetic Chinese HTML articles (benchmarks/corpus.py) to POST /analyze
+from concurrent client threads and reports p50/p90/p99 latency and requests
+per second, followed by the service's own /stats counters.
+
+Usage:
+    python benchmarks/bench_service.py [--url http://127.0.0.1:8765] [--requests 2000] [--concurrency 16]
+
+Without --url a service is started on a free local port (with --workers,
+--batch-size, --batch-wait-ms and --tperson passed through) and stopped
+afterwards.
+"""
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+from corpus import generate_articles  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(url + '/health', timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def post(url: str, body: bytes) -> float:
+    start = time.perf_counter()
+    request = urllib.request.Request(url + '/analyze', data=body, headers={'Content-Type': 'text/html'})
+    with urllib.request.urlopen(request, timeout=60) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q / 100 * len(sorted_values)))]
+
+
+def run(url: str, args) -> None:
+    pages = [html.encode('utf-8') for html in generate_articles(min(args.requests, 200), args.chars, args.density)]
+    bodies = [pages[i % len(pages)] for i in range(args.requests)]
+    for body in bodies[:args.concurrency]:  # warm-up
+        post(url, body)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        latencies = sorted(pool.map(lambda body: post(url, body), bodies))
+    elapsed = time.perf_counter() - start
+    print(f"requests: {len(bodies):,} x {len(bodies[0]) / 1e3:.1f} KB, concurrency {args.concurrency}")
+    print(f"throughput: {len(bodies) / elapsed:,.1f} req/s ({elapsed:.2f} s)")
+    print("latency: " + ", ".join(f"p{q} {percentile(latencies, q) * 1000:.1f} ms" for q in (50, 90, 99)))
+    with urllib.request.urlopen(url + '/stats') as response:
+        stats = json.load(response)
+    print(f"service: {stats['batches']:,} batches, mean batch size {stats['mean_batch_size']:.1f}, "
+          f"server-side p50 {stats['latency_ms']['p50']:.1f} ms, p99 {stats['latency_ms']['p99']:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='running service to test; default: start one')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--chars', type=int, default=3000, help='characters per synthetic article')
+    parser.add_argument('--density', type=float, default=5.0, help='references per 1000 characters')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--batch-wait-ms', type=float, default=5.0)
+    parser.add_argument('--tperson', default='Crawler-Persen/tPerson.csv')
+    args = parser.parse_args()
+
+    if args.url:
+        run(args.url.rstrip('/'), args)
+        return
+    port = free_port()
+    service = subprocess.Popen(
+        [sys.executable, str(ROOT / 'verse_service.py'), '--port', str(port), '--workers', str(args.workers),
+         '--batch-size', str(args.batch_size), '--batch-wait-ms', str(args.batch_wait_ms),
+         '--tperson', args.tperson, '--log-level', 'WARNING'])
+    try:
+        url = f"http://127.0.0.1:{port}"
+        wait_until_ready(url)
+        run(url, args)
+    finally:
+        service.terminate()
+        service.wait()
+
+
+if __name__ == '__main__':
+    main()
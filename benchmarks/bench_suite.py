@@ -0,0 +1,154 @@
+"""
+Benchmark suite: extraction, normalization, person loading and the full scan
+on synthetic corpora of several sizes
+
+For every size a Chinese and an English corpus plus a tPerson.csv are
+generated with benchmarks/corpus.py (same seed = same files), then:
+
+    extract    VerseExtractor.extract_verses over every article (zh and en)
+    normalize  VerseExtractor.normalize_verse over every reference match
+    persons    PersonVerseMatcher(tPerson.csv) loading
+    pipeline   main(['scan', ...]) on the Chinese corpus, cache off
+
+Results are written as JSON; --compare prints the ratio against an older
+results file, so a change can be measured before and after.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 50,200,800] [--output bench_results.json] [--compare OLD.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bible_verse_analyzer import Config, PersonVerseMatcher, VerseExtractor, main as analyzer_main  # noqa: E402
+from corpus import generate_corpus, generate_tperson  # noqa: E402
+
+
+def median_time(repeat: int, func: Callable[[], object]) -> float:
+    """
+    Returns: the median wall time of `repeat` calls
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_extract(paths: List[Path], language: str, repeat: int) -> Dict:
+    config = Config(LANGUAGE=language)
+    verses = []
+
+    def run():
+        verses.clear()
+        for path in paths:
+            verses.extend(VerseExtractor(str(path), config=config).extract_verses())
+
+    seconds = median_time(repeat, run)
+    size = sum(path.stat().st_size for path in paths)
+    return {'seconds': seconds, 'files': len(paths), 'bytes': size, 'verses': len(verses),
+            'files_per_second': len(paths) / seconds, 'mb_per_second': size / 1e6 / seconds}
+
+
+def bench_normalize(paths: List[Path], repeat: int) -> Dict:
+    extractor = VerseExtractor('', config=Config(LANGUAGE='zh'))
+    matches = []
+    for path in paths:
+        text = extractor.html_to_text(path.read_text(encoding='utf-8'))
+        matches.extend(match[:3] for match in extractor.verse_pattern.findall(text))
+
+    def run():
+        for book, chapter, verse in matches:
+            extractor.normalize_verse(book, chapter, verse)
+
+    seconds = median_time(repeat, run)
+    return {'seconds': seconds, 'calls': len(matches), 'ns_per_call': seconds / max(1, len(matches)) * 1e9}
+
+
+def bench_persons(tperson: Path, repeat: int) -> Dict:
+    seconds = median_time(repeat, lambda: PersonVerseMatcher(str(tperson)))
+    return {'seconds': seconds}
+
+
+def bench_pipeline(article_dir: Path, tperson: Path, work: Path, repeat: int) -> Dict:
+    output = work / 'result.csv'
+    argv = ['scan', '--article-dir', str(article_dir), '--tperson', str(tperson),
+            '--person-index', str(work / 'missing.bvidx'), '--output', str(output),
+            '--no-cache', '--checkpoint-every', '0', '--log-level', 'WARNING']
+    seconds = median_time(repeat, lambda: analyzer_main(argv))
+    return {'seconds': seconds, 'output_bytes': output.stat().st_size if output.exists() else 0}
+
+
+def run_size(articles: int, args, work: Path) -> Dict:
+    zh_dir, en_dir, tperson = work / 'zh', work / 'en', work / 'tPerson.csv'
+    zh_paths = generate_corpus(zh_dir, articles, args.chars, args.density, 'zh', args.seed)
+    en_paths = generate_corpus(en_dir, articles, args.chars, args.density, 'en', args.seed)
+    generate_tperson(tperson, args.persons, args.seed)
+    result = {
+        'extract_zh': bench_extract(zh_paths, 'zh', args.repeat),
+        'extract_en': bench_extract(en_paths, 'en', args.repeat),
+        'normalize': bench_normalize(zh_paths, args.repeat),
+        'persons': bench_persons(tperson, args.repeat),
+        'pipeline': bench_pipeline(zh_dir, tperson, work, args.repeat),
+    }
+    print(f"{articles:>6} articles  "
+          f"extract zh {result['extract_zh']['seconds']:.3f} s ({result['extract_zh']['mb_per_second']:.1f} MB/s)  "
+          f"en {result['extract_en']['seconds']:.3f} s  "
+          f"normalize {result['normalize']['ns_per_call']:,.0f} ns/call  "
+          f"persons {result['persons']['seconds']:.3f} s  "
+          f"pipeline {result['pipeline']['seconds']:.3f} s")
+    return result
+
+
+def compare(old: Dict, new: Dict) -> None:
+    """Print new/old time ratios for the sizes both runs have (< 1.00 = faster)"""
+    print(f"\nnew / old seconds ({old['meta'].get('timestamp', '?')} -> {new['meta']['timestamp']}):")
+    for size, result in new['results'].items():
+        if size not in old['results']:
+            continue
+        ratios = [f"{name} {result[name]['seconds'] / old['results'][size][name]['seconds']:.2f}"
+                  for name in result if name in old['results'][size] and old['results'][size][name]['seconds']]
+        print(f"{size:>6} articles  " + '  '.join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='50,200,800', help='comma-separated article counts')
+    parser.add_argument('--chars', type=int, default=20_000, help='characters per article')
+    parser.add_argument('--density', type=float, default=5.0, help='references per 1000 characters')
+    parser.add_argument('--persons', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement (median is kept)')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', metavar='OLD_JSON', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                 'platform': platform.platform(), 'chars': args.chars, 'density': args.density,
+                 'persons': args.persons, 'seed': args.seed, 'repeat': args.repeat},
+        'results': {},
+    }
+    for articles in [int(size) for size in args.sizes.split(',')]:
+        with tempfile.TemporaryDirectory(prefix='bench_suite_') as work:
+            report['results'][str(articles)] = run_size(articles, args, Path(work))
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f"results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            compare(json.load(file), report)
+
+
+if __name__ == '__main__':
+    main()
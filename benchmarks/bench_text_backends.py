@@ -0,0 +1,70 @@
+"""
+Benchmark: HTML-to-text backends
+
+Converts every article of a fixture corpus with each backend in
+TEXT_BACKENDS, checks that all backends find the same verses as the
+BeautifulSoup reference and reports throughput in MB/s.
+
+Usage:
+    python benchmarks/bench_text_backends.py [--corpus DIR] [--articles 40] [--chars 30000]
+
+Without --corpus a synthetic corpus with nested markup, entities, scripts and
+comments (benchmarks/corpus.py, markup=True) is generated in a temporary directory.
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bible_verse_analyzer import (  # noqa: E402
+    Config, TEXT_BACKENDS, get_normalizer, get_verse_pattern, html_to_text, list_article_files,
+)
+from corpus import generate_corpus  # noqa: E402
+
+
+def verses_in(text: str) -> List[str]:
+    normalizer = get_normalizer()
+    return [verse for match in get_verse_pattern(Config.LANGUAGE).findall(text)
+            for verse in normalizer.expand(*match, language=Config.LANGUAGE)]
+
+
+def run(corpus: Path) -> None:
+    documents: Dict[str, str] = {
+        str(path): path.read_text(encoding='utf-8') for path in list_article_files(corpus)
+    }
+    total_bytes = sum(len(content.encode('utf-8')) for content in documents.values())
+    print(f"corpus: {corpus} ({len(documents)} files, {total_bytes / 1e6:.1f} MB)")
+
+    reference = {path: verses_in(html_to_text(content, 'bs4')) for path, content in documents.items()}
+    for backend in TEXT_BACKENDS:
+        start = time.perf_counter()
+        texts = {path: html_to_text(content, backend) for path, content in documents.items()}
+        elapsed = time.perf_counter() - start
+        mismatches = [path for path, text in texts.items() if verses_in(text) != reference[path]]
+        status = 'same verses' if not mismatches else f"{len(mismatches)} files differ, e.g. {mismatches[0]}"
+        print(f"{backend:>10}: {total_bytes / 1e6 / elapsed:8.2f} MB/s  ({elapsed:.2f} s, {status})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', type=Path, help='directory of .htm/.html articles')
+    parser.add_argument('--articles', type=int, default=40)
+    parser.add_argument('--chars', type=int, default=30_000, help='characters per synthetic article')
+    parser.add_argument('--density', type=float, default=5.0, help='references per 1000 characters')
+    args = parser.parse_args()
+
+    if args.corpus:
+        run(args.corpus)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_corpus(Path(tmp), args.articles, args.chars, args.density, markup=True)
+        run(Path(tmp))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: ZH verse matching, regex vs. Aho-Corasick book-name automaton
+
+Runs VERSE_PATTERN_ZH.findall and ZhAutomatonMatcher.findall over the text
+of long synthetic Chinese articles (benchmarks/corpus.py), checks that both
+return identical matches and reports characters per second.
+
+Usage:
+    python benchmarks/bench_zh_matcher.py [--articles 20] [--chars 200000] [--density 5] [--corpus DIR]
+
+With --corpus the plain text of the given articles (via TEXT_BACKEND) is used instead.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bible_verse_analyzer import get_verse_pattern, html_to_text, list_article_files  # noqa: E402
+from corpus import generate_articles  # noqa: E402
+
+
+def time_matcher(matcher, texts: List[str]):
+    start = time.perf_counter()
+    matches = [matcher.findall(text) for text in texts]
+    return matches, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--articles', type=int, default=20)
+    parser.add_argument('--chars', type=int, default=200_000, help='characters per synthetic article')
+    parser.add_argument('--density', type=float, default=5.0, help='references per 1000 characters')
+    parser.add_argument('--corpus', type=Path, help='directory of .htm/.html articles to use instead')
+    args = parser.parse_args()
+
+    if args.corpus:
+        texts = [html_to_text(path.read_text(encoding='utf-8')) for path in list_article_files(args.corpus)]
+    else:
+        texts = [html_to_text(html) for html in generate_articles(args.articles, args.chars, args.density)]
+    total_chars = sum(len(text) for text in texts)
+    print(f"texts: {len(texts)}, {total_chars:,} characters")
+
+    results = {}
+    for name in ('regex', 'automaton'):
+        get_verse_pattern('zh', name)  # build outside the timed region
+        matches, elapsed = time_matcher(get_verse_pattern('zh', name), texts)
+        results[name] = matches
+        found = sum(len(m) for m in matches)
+        print(f"{name:>10}: {total_chars / elapsed / 1e6:8.2f} M chars/s  ({elapsed:.2f} s, {found:,} matches)")
+    print('identical matches' if results['regex'] == results['automaton'] else 'MATCHES DIFFER')
+
+
+if __name__ == '__main__':
+    main()
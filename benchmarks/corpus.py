@@ -0,0 +1,204 @@
+"""
+Deterministic synthetic corpus for the benchmarks
+
+generate_corpus writes HTML articles of a given size and verse density;
+the same seed always produces byte-identical files. Chinese articles mix
+full book names (約翰福音三章16節), abbreviations (約3:16), Chinese-numeral
+chapters (約三16, 詩一百一十九105), 《》-quoted names and ranges/lists;
+English articles use "John 3:16", "1 Samuel 17:45-47" and "Matt 5:3,5".
+The Chinese filler deliberately contains characters that are also book
+abbreviations (約, 出, 來, 得, 門), so matchers see realistic near-misses.
+References are drawn from a pool of popular verses, shared with
+generate_tperson, so that person matching gets realistic hit rates.
+With markup=True paragraphs are nested in more tags, with entities and
+occasional <script>/comment blocks that contain references which must not
+be counted, for the HTML-to-text benchmarks.
+
+Usage:
+    python benchmarks/corpus.py OUT_DIR [--articles 100] [--chars 20000] [--density 5] [--language zh]
+"""
+import argparse
+import csv
+import random
+import sys
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bible_verse_analyzer import BOOK_MAPPING, BOOK_ORDER, VERSE_COUNTS, Config  # noqa: E402
+
+DIGITS = '一二三四五六七八九'
+ZH_FILLER = [
+    '我們從經文中看見神的恩典與真理，', '也學習在生活中實踐所聽見的道。', '弟兄姊妹要彼此相愛，',
+    '教會在逼迫中仍然興旺，', '保羅寫信勸勉眾聖徒，', '詩人在苦難中仍然讚美，', '先知呼召百姓悔改歸向神。',
+    # 含有書卷縮寫用字（約、出、來、得、門、加、多）但不是經文出處的句子
+    '約定的時候到了，', '他出來以後就多有喜樂，', '耶穌進了門，', '來聚會的人都得了造就，', '弟兄姊妹要加倍留心，',
+]
+EN_FILLER = [
+    'We see grace and truth in the Scriptures, ', 'and we learn to live out the word we hear. ',
+    'The church grew even under persecution, ', 'Paul wrote to encourage the saints, ',
+    'the psalmist praised God in suffering, ', 'and the prophets called the people to return. ',
+]
+Verse = Tuple[str, int, int]
+
+
+def chinese_numeral(n: int) -> str:
+    """Write 1..199 positionally (三, 十六, 二十三, 一百一十九)"""
+    hundreds, rest = divmod(n, 100)
+    tens, ones = divmod(rest, 10)
+    text = DIGITS[hundreds - 1] + '百' if hundreds else ''
+    if hundreds and rest and tens == 0:
+        text += '零'
+    if tens:
+        text += ('' if tens == 1 and not hundreds else DIGITS[tens - 1]) + '十'
+    if ones:
+        text += DIGITS[ones - 1]
+    return text
+
+
+def book_names() -> Dict[str, Dict[str, str]]:
+    """
+    Returns: book code -> {'full', 'abbr', 'en'} names that VERSE_PATTERN_ZH/EN accept
+    """
+    names: Dict[str, Dict[str, List[str]]] = {code: {'zh': [], 'en': []} for code in BOOK_ORDER}
+    for name, code in BOOK_MAPPING.items():
+        if code in names:
+            names[code]['en' if name.isascii() else 'zh'].append(name)
+    result = {}
+    for code, found in names.items():
+        zh = sorted((name for name in found['zh'] if name in Config.VERSE_PATTERN_ZH), key=len)
+        en = sorted(found['en'], key=len)
+        if zh and en:
+            result[code] = {'full': zh[-1], 'abbr': zh[0], 'en': en[-1].title()}
+    return result
+
+
+def verse_pool(size: int, seed: int) -> List[Verse]:
+    """Popular verses: a fixed random sample of valid (book, chapter, verse) triples"""
+    rng = random.Random(seed)
+    books = sorted(book_names())
+    pool = set()
+    while len(pool) < size:
+        book = rng.choice(books)
+        chapter = rng.randint(1, len(VERSE_COUNTS[book]))
+        pool.add((book, chapter, rng.randint(1, VERSE_COUNTS[book][chapter - 1])))
+    return sorted(pool)
+
+
+def zh_reference(rng: random.Random, names: Dict[str, str], chapter: int, verse: int, last: int) -> str:
+    end = min(last, verse + rng.randint(1, 3))
+    forms = [
+        f"{names['full']}{chinese_numeral(chapter)}章{verse}節",
+        f"{names['abbr']}{chapter}:{verse}",
+        f"{names['abbr']}{chinese_numeral(chapter)}{verse}",
+        f"《{names['full']}》{chapter}:{verse}",
+        f"{names['abbr']}{chapter}:{verse}-{end}",
+        f"{names['abbr']}{chinese_numeral(chapter)}{verse}，{end}",
+    ]
+    return rng.choice(forms)
+
+
+def en_reference(rng: random.Random, names: Dict[str, str], chapter: int, verse: int, last: int) -> str:
+    end = min(last, verse + rng.randint(1, 3))
+    forms = [f"{names['en']} {chapter}:{verse}", f"{names['en']} {chapter}:{verse}-{end}",
+             f"{names['en']} {chapter}:{verse},{end}"]
+    return rng.choice(forms)
+
+
+def generate_article(rng: random.Random, pool: List[Verse], names: Dict[str, Dict[str, str]],
+                     chars: int, density: float, language: str, markup: bool = False) -> str:
+    """One HTML article of about `chars` characters with `density` references per 1000 characters"""
+    filler = ZH_FILLER if language == 'zh' else EN_FILLER
+    reference = zh_reference if language == 'zh' else en_reference
+    # 每段填充文字約 mean_len 個字元，換算成每一段插入經文的機率
+    mean_len = sum(len(part) for part in filler) / len(filler)
+    paragraphs, paragraph, size = [], [], 0
+    while size < chars:
+        if rng.random() < density * mean_len / 1000:
+            book, chapter, verse = rng.choice(pool)
+            last = VERSE_COUNTS[book][chapter - 1]
+            part = f"（{reference(rng, names[book], chapter, verse, last)}）"
+        else:
+            part = rng.choice(filler)
+        paragraph.append(part)
+        size += len(part)
+        if len(paragraph) >= 8:
+            paragraphs.append(paragraph_html(rng, pool, names, paragraph, language, markup))
+            paragraph = []
+    paragraphs.append(paragraph_html(rng, pool, names, paragraph, language, markup))
+    return ('<html><head><meta charset="utf-8"><title>Article</title><script>var x = 1;</script></head>'
+            f'<body><div class="content">{"".join(paragraphs)}</div></body></html>')
+
+
+def paragraph_html(rng: random.Random, pool: List[Verse], names: Dict[str, Dict[str, str]],
+                   parts: List[str], language: str, markup: bool) -> str:
+    if not markup:
+        return f"<p>{''.join(parts)}</p>"
+    reference = zh_reference if language == 'zh' else en_reference
+    book, chapter, verse = rng.choice(pool)
+    extra = reference(rng, names[book], chapter, verse, VERSE_COUNTS[book][chapter - 1])
+    html = f'<div class="p"><p>{"".join(parts)} &amp; <b>{extra}</b></p></div>'
+    if rng.random() < 0.05:
+        html += f'<script>var ref = "{extra}";</script><!-- {extra} -->'
+    return html
+
+
+def generate_articles(articles: int, chars: int = 20_000, density: float = 5.0, language: str = 'zh',
+                      seed: int = 0, pool_size: int = 2000, markup: bool = False) -> Iterator[str]:
+    """
+    Returns: `articles` synthetic HTML articles, the same ones generate_corpus writes
+    """
+    rng = random.Random(seed)
+    names = book_names()
+    pool = verse_pool(pool_size, seed)
+    for _ in range(articles):
+        yield generate_article(rng, pool, names, chars, density, language, markup)
+
+
+def generate_corpus(directory: Path, articles: int, chars: int = 20_000, density: float = 5.0,
+                    language: str = 'zh', seed: int = 0, pool_size: int = 2000, markup: bool = False) -> List[Path]:
+    """
+    Write `articles` synthetic articles into directory (in 100-file subdirectories)
+    Returns: the written paths
+    """
+    paths = []
+    for index, html in enumerate(generate_articles(articles, chars, density, language, seed, pool_size, markup)):
+        path = Path(directory) / f"{index // 100:03d}" / f"article_{index:06d}.htm"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def generate_tperson(path: Path, persons: int = 3000, seed: int = 0, pool_size: int = 2000) -> None:
+    """Write a tPerson.csv whose verses come mostly from the corpus verse pool"""
+    rng = random.Random(seed + 1)
+    pool = verse_pool(pool_size, seed)
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['PersonID', 'Name', 'ZhName', 'Verses'])
+        for person_id in range(1, persons + 1):
+            verses = [rng.choice(pool) for _ in range(rng.randint(1, 12))]
+            writer.writerow([person_id, f"Person{person_id}", f"人物{person_id}",
+                             ';'.join(f"{book} {chapter}:{verse}" for book, chapter, verse in verses)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('out_dir', type=Path)
+    parser.add_argument('--articles', type=int, default=100)
+    parser.add_argument('--chars', type=int, default=20_000, help='characters per article')
+    parser.add_argument('--density', type=float, default=5.0, help='references per 1000 characters')
+    parser.add_argument('--language', choices=['zh', 'en'], default='zh')
+    parser.add_argument('--persons', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generate_corpus(args.out_dir / 'article', args.articles, args.chars, args.density, args.language, args.seed)
+    generate_tperson(args.out_dir / 'tPerson.csv', args.persons, args.seed)
+    print(f"wrote {args.articles} articles and tPerson.csv to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,53 @@
+from __future__ import annotations
+
 import os
+import sys
 import re
 import csv
 import logging
-from bs4 import BeautifulSoup
-import pandas as pd
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+import argparse
+import time
+import cProfile
+import bisect
+import hashlib
+import json
+import sqlite3
+import mmap
+import struct
+import gzip
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from itertools import chain, repeat
+from contextlib import contextmanager
+import importlib
+from typing import List, Dict, Tuple, Optional, Iterator, Iterable, Union
+from dataclasses import dataclass, asdict
 from pathlib import Path
+from html.parser import HTMLParser
+
+logger = logging.getLogger("bible_verse_analyzer")
+
+
+class LazyModule:
+    """
+    Stand-in for a heavy module that is imported on first attribute access
+    Keeps `python bible_verse_analyzer.py stats` and other short commands
+    from paying the pandas/numpy import
+    """
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        # 只在找不到屬性時才會呼叫；第一次存取後保留模組，之後不再經過 import 機制
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+np = LazyModule('numpy')
+pd = LazyModule('pandas')
 
 # Configuration class
 @dataclass
@@ -14,11 +55,53 @@ class Config:
     # 設定檔案路徑
     ARTICLE_DIR: str = "Crawler-Persen/ZH/article/"
     TPERSON_FILE: str = "Crawler-Persen/tPerson.csv"
+    # 由 --build-index 產生的二進位索引；存在時取代 tPerson.csv 的解析
+    PERSON_INDEX_FILE: str = "Crawler-Persen/tPerson.bvidx"
     OUTPUT_FILE: str = "Crawler-Persen/verse_analysis_results_0502.csv"
     LANGUAGE: str = "zh"  # 'zh' for Chinese, 'en' for English
+    WORKERS: int = 1  # 平行處理的行程數，1 為單行程
+    # 預讀管線：讀檔執行緒數與最多預先讀入的檔案數（0 為不預讀）
+    PREFETCH_DEPTH: int = 0
+    READ_THREADS: int = 4
+    # 增量分析快取；CACHE_FILE 為空時使用 OUTPUT_FILE 旁的 *_cache.sqlite
+    USE_CACHE: bool = True
+    CACHE_FILE: str = ""
+    # 每完成 CHECKPOINT_EVERY 個檔案寫一次檢查點（0 為停用），供 --resume 接續；
+    # CHECKPOINT_DIR 為空時使用 OUTPUT_FILE 旁的 *_checkpoint 目錄
+    CHECKPOINT_EVERY: int = 1000
+    CHECKPOINT_DIR: str = ""
+    # HTML 轉純文字後端：'bs4'（BeautifulSoup）、'htmlparser'、'lxml'（皆不建樹）
+    TEXT_BACKEND: str = "bs4"
+    # 中文經文比對方式：'regex'（VERSE_PATTERN_ZH）或 'automaton'（Aho-Corasick 找書名，結果相同）
+    ZH_MATCHER: str = "regex"
+    # 串流輸出：每處理完一個檔案即寫入 CSV，記憶體只保留彙總
+    STREAM_OUTPUT: bool = False
+    # 終端機訊息等級（DEBUG 會列出每個檔案的經文）與 JSON 執行報告路徑
+    LOG_LEVEL: str = "INFO"
+    REPORT_FILE: str = ""
+    # 常駐 HTTP 服務（verse_service.py）：位址、分析行程數（0 為在服務行程內分析）與微批次大小/等待時間
+    SERVICE_HOST: str = "127.0.0.1"
+    SERVICE_PORT: int = 8765
+    SERVICE_WORKERS: int = 2
+    BATCH_SIZE: int = 32
+    BATCH_WAIT_MS: float = 5.0
+    # 單一請求本文的上限（位元組），超過時回應 413 而不讀入記憶體
+    SERVICE_MAX_BODY_BYTES: int = 16 * 1024 * 1024
+    # 輸出格式：'csv'（預設）、'parquet'、'feather'；後兩者以字典編碼字串欄位並分批寫入 row group
+    OUTPUT_FORMAT: str = "csv"
+    ROW_GROUP_SIZE: int = 100_000
+    # 額外的彙總報表（見 SUMMARY_VIEWS）：'person'、'book'、'file'、'top_verses'、'cooccurrence'
+    SUMMARIES: Tuple[str, ...] = ()
+    TOP_VERSES: int = 100  # top_verses 報表保留的經文數
+    # 經文解析快取（LRU）的容量：原始比對結果 -> 正規化經文，以及經文 -> 人物列；0 為停用
+    RESOLVE_CACHE_SIZE: int = 20_000
     # 正規表達式模式
     # 支援英文
-    VERSE_PATTERN_EN: str = r"([1-3]?\s*[A-Za-z]+)\s*(\d+):(\d+)"
+    VERSE_PATTERN_EN: str = (
+        r"([1-3]?\s*[A-Za-z]+)\s*(\d+):(\d+)"
+        # 範圍與列舉：Gen 1:1-3, John 3:16,18, Gen 1:1-2:3
+        r"((?:\s*(?:[-–—]|,)\s*(?:\d+:)?\d+(?!\d|\s*[A-Za-z]+\s*\d+:))*)"
+    )
     # 支援中文全名、中文縮寫
     VERSE_PATTERN_ZH: str = (
         r"《?("
@@ -34,7 +117,9 @@ class Config:
         r"希伯來書|雅各書|彼得前書|彼得後書|約翰一書|約翰二書|"
         r"約翰三書|猶大書|啟示錄|"
         r"創|出|利|民|申|書|士|得|撒上|撒下|王上|王下|代上|代下|拉|尼|斯|伯|詩|箴|傳|雅|賽|耶|哀|結|但|何|珥|摩|俄|拿|彌|鴻|哈|番|該|亞|瑪|太|可|路|約|徒|羅|林前|林後|加|弗|腓|西|帖前|帖後|提前|提後|多|門|來|雅各|彼前|彼後|約一|約二|約三|猶|啟"
-        r")》?(\d+|[一二三四五六七八九十百廿]*)章?(\d+)節?"
+        r")》?(\d+|[一二三四五六七八九十百廿卅○〇零]*)章?[:：]?(\d+)節?"
+        # 範圍與列舉：約3:16-18、太5:3,5,7、創1:1-2:3、創一1～二3
+        r"((?:\s*(?:[-–—~～]|[,，、])\s*(?:\d+(?:[:：]|章)|[一二三四五六七八九十百廿卅○〇零]+章?)?\d+節?)*)"
     )
     # ([一二三四五六七八九十百廿]*)(\d+)
     ERROR_MESSAGES = {
@@ -43,342 +128,1071 @@ class Config:
         "parse_error": "Error parsing file: {}"
     }
 
+# 書卷名稱對照表（英文、繁體中文全名及縮寫 -> tPerson.csv 書卷代碼）
+BOOK_MAPPING: Dict[str, str] = {
+    # 英文
+    'exodus': 'Exod',
+    'genesis': 'Gen',
+    'leviticus': 'Lev',
+    'numbers': 'Num',
+    'deuteronomy': 'Deut',
+    'joshua': 'Josh',
+    'judges': 'Judg',
+    'ruth': 'Ruth',
+    '1 samuel': '1Sam',
+    '2 samuel': '2Sam',
+    '1 kings': '1Kgs',
+    '2 kings': '2Kgs',
+    '1 chronicles': '1Chr',
+    '2 chronicles': '2Chr',
+    'ezra': 'Ezra',
+    'nehemiah': 'Neh',
+    'esther': 'Esth',
+    'job': 'Job',
+    'psalms': 'Ps',
+    'proverbs': 'Prov',
+    'ecclesiastes': 'Eccl',
+    'song of solomon': 'Song',
+    'isaiah': 'Isa',
+    'jeremiah': 'Jer',
+    'lamentations': 'Lam',
+    'ezekiel': 'Ezek',
+    'daniel': 'Dan',
+    'hosea': 'Hos',
+    'joel': 'Joel',
+    'amos': 'Amos',
+    'obadiah': 'Obad',
+    'jonah': 'Jonah',
+    'micah': 'Mic',
+    'nahum': 'Nah',
+    'habakkuk': 'Hab',
+    'zephaniah': 'Zeph',
+    'haggai': 'Hag',
+    'zechariah': 'Zech',
+    'malachi': 'Mal',
+    'matthew': 'Matt',
+    'mark': 'Mark',
+    'luke': 'Luke',
+    'john': 'John',
+    'acts': 'Acts',
+    'romans': 'Rom',
+    '1 corinthians': '1Cor',
+    '2 corinthians': '2Cor',
+    'galatians': 'Gal',
+    'ephesians': 'Eph',
+    'philippians': 'Phil',
+    'colossians': 'Col',
+    '1 thessalonians': '1Thess',
+    '2 thessalonians': '2Thess',
+    '1 timothy': '1Tim',
+    '2 timothy': '2Tim',
+    'titus': 'Titus',
+    'philemon': 'Phlm',
+    'hebrews': 'Heb',
+    'james': 'James',
+    '1 peter': '1Pet',
+    '2 peter': '2Pet',
+    '1 john': '1John',
+    '2 john': '2John',
+    '3 john': '3John',
+    'jude': 'Jude',
+    'revelation': 'Rev',
+    # 繁體中文
+    '創世記': 'Gen',
+    '出埃及記': 'Exod',
+    '利未記': 'Lev',
+    '民數記': 'Num',
+    '申命記': 'Deut',
+    '約書亞記': 'Josh',
+    '士師記': 'Judg',
+    '路得記': 'Ruth',
+    '撒母耳記上': '1Sam',
+    '撒母耳記下': '2Sam',
+    '列王紀上': '1Kgs',
+    '列王紀下': '2Kgs',
+    '歷代志上': '1Chr',
+    '歷代志下': '2Chr',
+    '以斯拉記': 'Ezra',
+    '尼希米記': 'Neh',
+    '以斯帖記': 'Esth',
+    '約伯記': 'Job',
+    '詩篇': 'Ps',
+    '箴言': 'Prov',
+    '傳道書': 'Eccl',
+    '雅歌': 'Song',
+    '以賽亞書': 'Isa',
+    '耶利米書': 'Jer',
+    '耶利米哀歌': 'Lam',
+    '以西結書': 'Ezek',
+    '但以理書': 'Dan',
+    '何西阿書': 'Hos',
+    '約珥書': 'Joel',
+    '阿摩司書': 'Amos',
+    '俄巴底亞書': 'Obad',
+    '約拿書': 'Jonah',
+    '彌迦書': 'Mic',
+    '那鴻書': 'Nah',
+    '哈巴谷書': 'Hab',
+    '西番雅書': 'Zeph',
+    '哈該書': 'Hag',
+    '撒迦利亞書': 'Zech',
+    '瑪拉基書': 'Mal',
+    '馬太福音': 'Matt',
+    '馬可福音': 'Mark',
+    '路加福音': 'Luke',
+    '約翰福音': 'John',
+    '使徒行傳': 'Acts',
+    '羅馬書': 'Rom',
+    '哥林多前書': '1Cor',
+    '哥林多後書': '2Cor',
+    '加拉太書': 'Gal',
+    '以弗所書': 'Eph',
+    '腓立比書': 'Phil',
+    '歌羅西書': 'Col',
+    '帖撒羅尼迦前書': '1Thess',
+    '帖撒羅尼迦後書': '2Thess',
+    '提摩太前書': '1Tim',
+    '提摩太後書': '2Tim',
+    '提多書': 'Titus',
+    '腓利門書': 'Phlm',
+    '希伯來書': 'Heb',
+    '雅各書': 'James',
+    '彼得前書': '1Pet',
+    '彼得後書': '2Pet',
+    '約翰一書': '1John',
+    '約翰二書': '2John',
+    '約翰三書': '3John',
+    '猶大書': 'Jude',
+    '啟示錄': 'Rev',
+    # 繁體中文縮寫
+    '創': 'Gen',
+    '出': 'Exod',
+    '利': 'Lev',
+    '民': 'Num',
+    '申': 'Deut',
+    '書': 'Josh',
+    '士': 'Judg',
+    '得': 'Ruth',
+    '撒上': '1Sam',
+    '撒下': '2Sam',
+    '王上': '1Kgs',
+    '王下': '2Kgs',
+    '代上': '1Chr',
+    '代下': '2Chr',
+    '拉': 'Ezra',
+    '尼': 'Neh',
+    '斯': 'Esth',
+    '伯': 'Job',
+    '詩': 'Ps',
+    '箴': 'Prov',
+    '傳': 'Eccl',
+    '雅': 'Song',
+    '賽': 'Isa',
+    '耶': 'Jer',
+    '哀': 'Lam',
+    '結': 'Ezek',
+    '但': 'Dan',
+    '何': 'Hos',
+    '珥': 'Joel',
+    '摩': 'Amos',
+    '俄': 'Obad',
+    '拿': 'Jonah',
+    '彌': 'Mic',
+    '鴻': 'Nah',
+    '哈': 'Hab',
+    '番': 'Zeph',
+    '該': 'Hag',
+    '亞': 'Zech',
+    '瑪': 'Mal',
+    '太': 'Matt',
+    '可': 'Mark',
+    '路': 'Luke',
+    '約': 'John',
+    '徒': 'Acts',
+    '羅': 'Rom',
+    '林前': '1Cor',
+    '林後': '2Cor',
+    '加': 'Gal',
+    '弗': 'Eph',
+    '腓': 'Phil',
+    '西': 'Col',
+    '帖前': '1Thess',
+    '帖後': '2Thess',
+    '提前': '1Tim',
+    '提後': '2Tim',
+    '多': 'Titus',
+    '門': 'Phlm',
+    '來': 'Heb',
+    '雅各': 'James',
+    '彼前': '1Pet',
+    '彼後': '2Pet',
+    '約一': '1John',
+    '約二': '2John',
+    '約三': '3John',
+    '猶': 'Jude',
+    '啟': 'Rev',
+}
+
+# 正典順序的書卷代碼，用於經文的整數編號
+BOOK_ORDER: Tuple[str, ...] = (
+    'Gen', 'Exod', 'Lev', 'Num', 'Deut', 'Josh', 'Judg', 'Ruth', '1Sam', '2Sam',
+    '1Kgs', '2Kgs', '1Chr', '2Chr', 'Ezra', 'Neh', 'Esth', 'Job', 'Ps', 'Prov',
+    'Eccl', 'Song', 'Isa', 'Jer', 'Lam', 'Ezek', 'Dan', 'Hos', 'Joel', 'Amos',
+    'Obad', 'Jonah', 'Mic', 'Nah', 'Hab', 'Zeph', 'Hag', 'Zech', 'Mal',
+    'Matt', 'Mark', 'Luke', 'John', 'Acts', 'Rom', '1Cor', '2Cor', 'Gal', 'Eph',
+    'Phil', 'Col', '1Thess', '2Thess', '1Tim', '2Tim', 'Titus', 'Phlm', 'Heb', 'James',
+    '1Pet', '2Pet', '1John', '2John', '3John', 'Jude', 'Rev',
+)
+BOOK_ORDINALS: Dict[str, int] = {code: ordinal for ordinal, code in enumerate(BOOK_ORDER, start=1)}
+# 各書卷每章的節數（和合本與 KJV 相同的章節劃分），用於展開跨章範圍
+VERSE_COUNTS: Dict[str, Tuple[int, ...]] = {
+    'Gen': (
+        31, 25, 24, 26, 32, 22, 24, 22, 29, 32, 32, 20, 18, 24, 21, 16, 27, 33, 38, 18, 34, 24, 20,
+        67, 34, 35, 46, 22, 35, 43, 55, 32, 20, 31, 29, 43, 36, 30, 23, 23, 57, 38, 34, 34, 28, 34,
+        31, 22, 33, 26,
+    ),
+    'Exod': (
+        22, 25, 22, 31, 23, 30, 25, 32, 35, 29, 10, 51, 22, 31, 27, 36, 16, 27, 25, 26, 36, 31, 33,
+        18, 40, 37, 21, 43, 46, 38, 18, 35, 23, 35, 35, 38, 29, 31, 43, 38,
+    ),
+    'Lev': (
+        17, 16, 17, 35, 19, 30, 38, 36, 24, 20, 47, 8, 59, 57, 33, 34, 16, 30, 37, 27, 24, 33, 44,
+        23, 55, 46, 34,
+    ),
+    'Num': (
+        54, 34, 51, 49, 31, 27, 89, 26, 23, 36, 35, 16, 33, 45, 41, 50, 13, 32, 22, 29, 35, 41, 30,
+        25, 18, 65, 23, 31, 40, 16, 54, 42, 56, 29, 34, 13,
+    ),
+    'Deut': (
+        46, 37, 29, 49, 33, 25, 26, 20, 29, 22, 32, 32, 18, 29, 23, 22, 20, 22, 21, 20, 23, 30, 25,
+        22, 19, 19, 26, 68, 29, 20, 30, 52, 29, 12,
+    ),
+    'Josh': (
+        18, 24, 17, 24, 15, 27, 26, 35, 27, 43, 23, 24, 33, 15, 63, 10, 18, 28, 51, 9, 45, 34, 16,
+        33,
+    ),
+    'Judg': (36, 23, 31, 24, 31, 40, 25, 35, 57, 18, 40, 15, 25, 20, 20, 31, 13, 31, 30, 48, 25),
+    'Ruth': (22, 23, 18, 22),
+    '1Sam': (
+        28, 36, 21, 22, 12, 21, 17, 22, 27, 27, 15, 25, 23, 52, 35, 23, 58, 30, 24, 42, 15, 23, 29,
+        22, 44, 25, 12, 25, 11, 31, 13,
+    ),
+    '2Sam': (
+        27, 32, 39, 12, 25, 23, 29, 18, 13, 19, 27, 31, 39, 33, 37, 23, 29, 33, 43, 26, 22, 51, 39,
+        25,
+    ),
+    '1Kgs': (
+        53, 46, 28, 34, 18, 38, 51, 66, 28, 29, 43, 33, 34, 31, 34, 34, 24, 46, 21, 43, 29, 53,
+    ),
+    '2Kgs': (
+        18, 25, 27, 44, 27, 33, 20, 29, 37, 36, 21, 21, 25, 29, 38, 20, 41, 37, 37, 21, 26, 20, 37,
+        20, 30,
+    ),
+    '1Chr': (
+        54, 55, 24, 43, 26, 81, 40, 40, 44, 14, 47, 40, 14, 17, 29, 43, 27, 17, 19, 8, 30, 19, 32,
+        31, 31, 32, 34, 21, 30,
+    ),
+    '2Chr': (
+        17, 18, 17, 22, 14, 42, 22, 18, 31, 19, 23, 16, 22, 15, 19, 14, 19, 34, 11, 37, 20, 12, 21,
+        27, 28, 23, 9, 27, 36, 27, 21, 33, 25, 33, 27, 23,
+    ),
+    'Ezra': (11, 70, 13, 24, 17, 22, 28, 36, 15, 44),
+    'Neh': (11, 20, 32, 23, 19, 19, 73, 18, 38, 39, 36, 47, 31),
+    'Esth': (22, 23, 15, 17, 14, 14, 10, 17, 32, 3),
+    'Job': (
+        22, 13, 26, 21, 27, 30, 21, 22, 35, 22, 20, 25, 28, 22, 35, 22, 16, 21, 29, 29, 34, 30, 17,
+        25, 6, 14, 23, 28, 25, 31, 40, 22, 33, 37, 16, 33, 24, 41, 30, 24, 34, 17,
+    ),
+    'Ps': (
+        6, 12, 8, 8, 12, 10, 17, 9, 20, 18, 7, 8, 6, 7, 5, 11, 15, 50, 14, 9, 13, 31, 6, 10, 22, 12,
+        14, 9, 11, 12, 24, 11, 22, 22, 28, 12, 40, 22, 13, 17, 13, 11, 5, 26, 17, 11, 9, 14, 20, 23,
+        19, 9, 6, 7, 23, 13, 11, 11, 17, 12, 8, 12, 11, 10, 13, 20, 7, 35, 36, 5, 24, 20, 28, 23,
+        10, 12, 20, 72, 13, 19, 16, 8, 18, 12, 13, 17, 7, 18, 52, 17, 16, 15, 5, 23, 11, 13, 12, 9,
+        9, 5, 8, 28, 22, 35, 45, 48, 43, 13, 31, 7, 10, 10, 9, 8, 18, 19, 2, 29, 176, 7, 8, 9, 4, 8,
+        5, 6, 5, 6, 8, 8, 3, 18, 3, 3, 21, 26, 9, 8, 24, 13, 10, 7, 12, 15, 21, 10, 20, 14, 9, 6,
+    ),
+    'Prov': (
+        33, 22, 35, 27, 23, 35, 27, 36, 18, 32, 31, 28, 25, 35, 33, 33, 28, 24, 29, 30, 31, 29, 35,
+        34, 28, 28, 27, 28, 27, 33, 31,
+    ),
+    'Eccl': (18, 26, 22, 16, 20, 12, 29, 17, 18, 20, 10, 14),
+    'Song': (17, 17, 11, 16, 16, 13, 13, 14),
+    'Isa': (
+        31, 22, 26, 6, 30, 13, 25, 22, 21, 34, 16, 6, 22, 32, 9, 14, 14, 7, 25, 6, 17, 25, 18, 23,
+        12, 21, 13, 29, 24, 33, 9, 20, 24, 17, 10, 22, 38, 22, 8, 31, 29, 25, 28, 28, 25, 13, 15,
+        22, 26, 11, 23, 15, 12, 17, 13, 12, 21, 14, 21, 22, 11, 12, 19, 12, 25, 24,
+    ),
+    'Jer': (
+        19, 37, 25, 31, 31, 30, 34, 22, 26, 25, 23, 17, 27, 22, 21, 21, 27, 23, 15, 18, 14, 30, 40,
+        10, 38, 24, 22, 17, 32, 24, 40, 44, 26, 22, 19, 32, 21, 28, 18, 16, 18, 22, 13, 30, 5, 28,
+        7, 47, 39, 46, 64, 34,
+    ),
+    'Lam': (22, 22, 66, 22, 22),
+    'Ezek': (
+        28, 10, 27, 17, 17, 14, 27, 18, 11, 22, 25, 28, 23, 23, 8, 63, 24, 32, 14, 49, 32, 31, 49,
+        27, 17, 21, 36, 26, 21, 26, 18, 32, 33, 31, 15, 38, 28, 23, 29, 49, 26, 20, 27, 31, 25, 24,
+        23, 35,
+    ),
+    'Dan': (21, 49, 30, 37, 31, 28, 28, 27, 27, 21, 45, 13),
+    'Hos': (11, 23, 5, 19, 15, 11, 16, 14, 17, 15, 12, 14, 16, 9),
+    'Joel': (20, 32, 21),
+    'Amos': (15, 16, 15, 13, 27, 14, 17, 14, 15),
+    'Obad': (21,),
+    'Jonah': (17, 10, 10, 11),
+    'Mic': (16, 13, 12, 13, 15, 16, 20),
+    'Nah': (15, 13, 19),
+    'Hab': (17, 20, 19),
+    'Zeph': (18, 15, 20),
+    'Hag': (15, 23),
+    'Zech': (21, 13, 10, 14, 11, 15, 14, 23, 17, 12, 17, 14, 9, 21),
+    'Mal': (14, 17, 18, 6),
+    'Matt': (
+        25, 23, 17, 25, 48, 34, 29, 34, 38, 42, 30, 50, 58, 36, 39, 28, 27, 35, 30, 34, 46, 46, 39,
+        51, 46, 75, 66, 20,
+    ),
+    'Mark': (45, 28, 35, 41, 43, 56, 37, 38, 50, 52, 33, 44, 37, 72, 47, 20),
+    'Luke': (
+        80, 52, 38, 44, 39, 49, 50, 56, 62, 42, 54, 59, 35, 35, 32, 31, 37, 43, 48, 47, 38, 71, 56,
+        53,
+    ),
+    'John': (51, 25, 36, 54, 47, 71, 53, 59, 41, 42, 57, 50, 38, 31, 27, 33, 26, 40, 42, 31, 25),
+    'Acts': (
+        26, 47, 26, 37, 42, 15, 60, 40, 43, 48, 30, 25, 52, 28, 41, 40, 34, 28, 41, 38, 40, 30, 35,
+        27, 27, 32, 44, 31,
+    ),
+    'Rom': (32, 29, 31, 25, 21, 23, 25, 39, 33, 21, 36, 21, 14, 23, 33, 27),
+    '1Cor': (31, 16, 23, 21, 13, 20, 40, 13, 27, 33, 34, 31, 13, 40, 58, 24),
+    '2Cor': (24, 17, 18, 18, 21, 18, 16, 24, 15, 18, 33, 21, 14),
+    'Gal': (24, 21, 29, 31, 26, 18),
+    'Eph': (23, 22, 21, 32, 33, 24),
+    'Phil': (30, 30, 21, 23),
+    'Col': (29, 23, 25, 18),
+    '1Thess': (10, 20, 13, 18, 28),
+    '2Thess': (12, 17, 18),
+    '1Tim': (20, 15, 16, 16, 25, 21),
+    '2Tim': (18, 26, 17, 22),
+    'Titus': (16, 15, 15),
+    'Phlm': (25,),
+    'Heb': (14, 18, 19, 16, 14, 20, 28, 13, 28, 39, 40, 29, 25),
+    'James': (27, 26, 18, 17, 20),
+    '1Pet': (25, 25, 22, 19, 14),
+    '2Pet': (21, 22, 18),
+    '1John': (10, 29, 24, 21, 21),
+    '2John': (13,),
+    '3John': (14,),
+    'Jude': (25,),
+    'Rev': (20, 29, 22, 11, 14, 17, 17, 13, 21, 11, 19, 17, 18, 20, 8, 21, 18, 24, 21, 15, 27, 21),
+}
+
+
+RANGE_SEPARATORS = frozenset('-–—~～')
+# 解析範圍／列舉尾段中的每一項：(分隔符, 數字章, 中文數字章, 節)
+TAIL_ITEM_PATTERN = re.compile(
+    r"\s*([-–—~～]|[,，、])\s*(?:(\d+)(?:[:：]|章)|([一二三四五六七八九十百廿卅○〇零]+)章?)?(\d+)節?"
+)
+
+
+def iter_verse_range(book: str, start_chapter: int, start_verse: int,
+                     end_chapter: int, end_verse: int) -> Iterator[Tuple[int, int]]:
+    """
+    Lazily yield the (chapter, verse) pairs after the start up to and including the end
+    Ranges are clipped to VERSE_COUNTS; books without versification data are not
+    expanded, so text such as "at 10:30-11:45" cannot produce unbounded ranges
+    """
+    counts = VERSE_COUNTS.get(book)
+    if counts is None or (end_chapter, end_verse) <= (start_chapter, start_verse):
+        return
+    for chapter in range(start_chapter, min(end_chapter, len(counts)) + 1):
+        first = start_verse + 1 if chapter == start_chapter else 1
+        last = counts[chapter - 1] if chapter < end_chapter else min(end_verse, counts[chapter - 1])
+        for number in range(first, last + 1):
+            yield chapter, number
+
+
+def is_known_verse(book: str, chapter: int, verse: int) -> bool:
+    """
+    Check a verse against VERSE_COUNTS (books without data are rejected)
+    """
+    counts = VERSE_COUNTS.get(book)
+    return counts is not None and 1 <= chapter <= len(counts) and 1 <= verse <= counts[chapter - 1]
+
+
+# 章節不接受前導零，"Gen 01:1" 與 "Gen 1:1" 是不同的鍵（與 CSV 比對器一致）
+VERSE_KEY_PATTERN = re.compile(r"(\S+) ([1-9]\d{0,2}):([1-9]\d{0,2})")
+
+
+def verse_id(verse: str) -> Optional[int]:
+    """
+    Encode a normalized verse key ("Gen 1:1") as an integer
+    The ID packs (book ordinal, chapter, verse) so IDs sort in canonical order
+    Returns: The verse ID, or None if the key is not a standard reference
+    """
+    match = VERSE_KEY_PATTERN.fullmatch(verse)
+    if match is None:
+        return None
+    ordinal = BOOK_ORDINALS.get(match.group(1))
+    chapter, number = int(match.group(2)), int(match.group(3))
+    if ordinal is None or chapter > 0xFF or number > 0xFF:
+        return None
+    return (ordinal << 16) | (chapter << 8) | number
+
+
+# 中文數字：個位數字、位值單位（十、百）及合寫的整十（廿、卅、卌）
+CHINESE_DIGITS: Dict[str, int] = {
+    '零': 0, '○': 0, '〇': 0,
+    '一': 1, 'ㄧ': 1, '二': 2, '兩': 2, '三': 3, '四': 4,
+    '五': 5, '六': 6, '七': 7, '八': 8, '九': 9,
+}
+CHINESE_UNITS: Dict[str, int] = {'十': 10, '百': 100}
+CHINESE_TENS: Dict[str, int] = {'廿': 20, '卅': 30, '卌': 40}
+
+
+def parse_chinese_numeral(text: str) -> Optional[int]:
+    """
+    Parse a chapter number written with Arabic digits or Chinese numerals
+    Supports positional forms (十五, 一百零三, 一百二十), 廿/卅 forms (廿三)
+    and digit-by-digit forms (一一九, 一○○)
+    Returns: The integer value, or None if text is not a numeral
+    """
+    if not text:
+        return None
+    if text.isdigit():
+        return int(text)
+    if any(ch in CHINESE_UNITS or ch in CHINESE_TENS for ch in text):
+        total = 0
+        digit = None
+        for ch in text:
+            if ch in CHINESE_DIGITS:
+                digit = CHINESE_DIGITS[ch]
+            elif ch in CHINESE_UNITS:
+                total += (1 if digit is None else digit) * CHINESE_UNITS[ch]
+                digit = None
+            elif ch in CHINESE_TENS:
+                total += CHINESE_TENS[ch]
+                digit = None
+            else:
+                return None
+        return total + (digit or 0)
+    value = 0
+    for ch in text:
+        if ch not in CHINESE_DIGITS:
+            return None
+        value = value * 10 + CHINESE_DIGITS[ch]
+    return value
+
+
+class VerseNormalizer:
+    """
+    Verse normalization engine, built once per process
+    Book names are resolved by longest-prefix lookup into BOOK_MAPPING and
+    chapters by parse_chinese_numeral. Only names and chapters that resolve
+    are memoized, up to cache_size entries each, so arbitrary matched text
+    cannot grow the caches without bound
+    """
+    # 實際出現的書名與章數寫法遠少於此上限
+    CACHE_SIZE = 4096
+
+    def __init__(self, book_mapping: Optional[Dict[str, str]] = None, cache_size: int = CACHE_SIZE):
+        self.book_mapping = {key.lower(): value for key, value in (book_mapping or BOOK_MAPPING).items()}
+        # 由長到短嘗試前綴，確保「約翰一書」不會被「約」搶先對應
+        self.key_lengths = sorted({len(key) for key in self.book_mapping}, reverse=True)
+        self.cache_size = cache_size
+        self._book_cache: Dict[str, str] = {}
+        self._chapter_cache: Dict[str, str] = {}
+
+    def resolve_book(self, book: str) -> str:
+        """
+        Map a book name or abbreviation to its tPerson.csv code
+        Returns: The book code, or the stripped input if no key matches
+        """
+        cached = self._book_cache.get(book)
+        if cached is not None:
+            return cached
+        key = book.strip().lower()
+        code = self.book_mapping.get(key)
+        if code is None:
+            for length in self.key_lengths:
+                if length < len(key) and key[:length] in self.book_mapping:
+                    code = self.book_mapping[key[:length]]
+                    break
+        if code is None:
+            return book.strip()
+        if len(self._book_cache) < self.cache_size:
+            self._book_cache[book] = code
+        return code
+
+    def resolve_chapter(self, chapter: str) -> str:
+        """
+        Convert a chapter written in Chinese numerals to Arabic digits
+        An empty chapter means chapter 1; unparseable chapters are kept as-is
+        """
+        cached = self._chapter_cache.get(chapter)
+        if cached is not None:
+            return cached
+        stripped = chapter.strip().lower()
+        if stripped == '':
+            result = '1'
+        elif stripped.isdigit():
+            result = stripped
+        else:
+            number = parse_chinese_numeral(stripped)
+            if number is None:
+                return stripped
+            result = str(number)
+        if len(self._chapter_cache) < self.cache_size:
+            self._chapter_cache[chapter] = result
+        return result
+
+    def normalize(self, book: str, chapter: str, verse: str, language: str = 'zh') -> str:
+        """
+        Normalize one (book, chapter, verse) match to "Book Chapter:Verse"
+        """
+        if language == 'zh':
+            return f"{self.resolve_book(book)} {self.resolve_chapter(chapter)}:{verse}"
+        return f"{self.resolve_book(book)} {chapter.strip().lower()}:{verse}"
+
+    def expand(self, book: str, chapter: str, verse: str, tail: str = '', language: str = 'zh') -> Iterator[str]:
+        """
+        Yield the normalized key of every verse a reference covers
+        tail is the range/list suffix captured by the verse pattern
+        (e.g. "-18", ",5,7" or "-2:3"); it is expanded lazily and only for
+        books in VERSE_COUNTS, other matches yield just their first verse
+        """
+        code = self.resolve_book(book)
+        chapter = self.resolve_chapter(chapter) if language == 'zh' else chapter.strip().lower()
+        yield f"{code} {chapter}:{verse}"
+        if not tail or not chapter.isdigit() or code not in VERSE_COUNTS:
+            return
+        current_chapter, current_verse = int(chapter), int(verse)
+        for separator, digit_chapter, numeral_chapter, item_verse in TAIL_ITEM_PATTERN.findall(tail):
+            item_chapter = current_chapter
+            if digit_chapter:
+                item_chapter = int(digit_chapter)
+            elif numeral_chapter:
+                item_chapter = parse_chinese_numeral(numeral_chapter) or current_chapter
+            item_number = int(item_verse)
+            if separator in RANGE_SEPARATORS:
+                for range_chapter, range_verse in iter_verse_range(code, current_chapter, current_verse,
+                                                                    item_chapter, item_number):
+                    yield f"{code} {range_chapter}:{range_verse}"
+            elif is_known_verse(code, item_chapter, item_number):
+                yield f"{code} {item_chapter}:{item_number}"
+            current_chapter, current_verse = item_chapter, item_number
+
+
+# 正規化邏輯變更時請遞增，讓快取自動失效
+NORMALIZATION_VERSION = 3
+
+_normalizer: Optional[VerseNormalizer] = None
+_verse_patterns: Dict[Tuple[str, str, str], object] = {}
+_reference_caches: Dict[str, "LRUCache"] = {}
+
+
+def get_normalizer() -> VerseNormalizer:
+    """
+    Return the process-wide VerseNormalizer, building it on first use
+    """
+    global _normalizer
+    if _normalizer is None:
+        _normalizer = VerseNormalizer()
+    return _normalizer
+
+
+class LRUCache:
+    """
+    Bounded mapping that evicts the least recently used entry when full
+    Counts hits, misses and evictions; take_counts moves the counts since its
+    last call into a StageTimer. size <= 0 disables caching (every get misses)
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.entries: "OrderedDict" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._taken = (0, 0, 0)
+
+    def get(self, key):
+        """
+        Returns: the cached value (never None) or None on a miss
+        """
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.size > 0:
+            self.entries[key] = value
+            if len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def take_counts(self, timer: "StageTimer", prefix: str) -> None:
+        counts = (self.hits, self.misses, self.evictions)
+        for name, value, taken in zip(('hits', 'misses', 'evictions'), counts, self._taken):
+            if value > taken:
+                timer.count(f"{prefix}_{name}", value - taken)
+        self._taken = counts
+
+
+def get_reference_cache(language: str, size: int) -> LRUCache:
+    """
+    Return the process-wide cache of resolved references for a language
+    Shared by every VerseExtractor in the process, so it carries over from
+    one document to the next (in worker processes as well)
+    """
+    cache = _reference_caches.get(language)
+    if cache is None or cache.size != size:
+        cache = _reference_caches[language] = LRUCache(size)
+    return cache
+
+
+class BookNameAutomaton:
+    """
+    Aho-Corasick automaton over a list of book names
+    Finds every occurrence of every name in a single pass over the text
+    """
+    def __init__(self, names: List[str]):
+        self.names = names
+        self.goto: List[Dict[str, int]] = [{}]
+        self.output: List[List[int]] = [[]]
+        for index, name in enumerate(names):
+            state = 0
+            for ch in name:
+                if ch not in self.goto[state]:
+                    self.goto.append({})
+                    self.output.append([])
+                    self.goto[state][ch] = len(self.goto) - 1
+                state = self.goto[state][ch]
+            self.output[state].append(index)
+        # 以廣度優先建立失敗連結，深度 1 的狀態失敗時回到起始狀態
+        self.fail = [0] * len(self.goto)
+        queue = deque(self.goto[0].values())
+        bfs_order = [0]
+        while queue:
+            state = queue.popleft()
+            bfs_order.append(state)
+            for ch, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                if state:
+                    self.fail[child] = self.goto[fallback].get(ch, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+        # 將失敗連結攤平成完整的轉移表，掃描時每個字元只需查一次字典
+        self.delta: List[Dict[str, int]] = [{} for _ in self.goto]
+        for state in bfs_order:
+            transitions = dict(self.delta[self.fail[state]]) if state else {}
+            transitions.update(self.goto[state])
+            self.delta[state] = transitions
+        self.lengths = [len(name) for name in names]
+        # 只含書卷名稱用字的連續片段，其餘字元一定回到起始狀態
+        alphabet = ''.join(sorted({ch for name in names for ch in name}))
+        self.run_pattern = re.compile(f"[{re.escape(alphabet)}]+")
+
+    def iter_candidates(self, text: str, ends: Optional[List[int]] = None) -> Iterator[Tuple[int, List[int]]]:
+        """
+        Yield (start, name indices) for every position where a name begins, in text order
+        If ends (sorted positions) is given, only names that end at one of them are needed,
+        so runs of name characters that contain none of those positions are skipped
+        """
+        delta, output, lengths = self.delta, self.output, self.lengths
+        for run in self.run_pattern.finditer(text):
+            run_start, run_end = run.span()
+            if ends is not None:
+                nearest = bisect.bisect_right(ends, run_start)
+                if nearest == len(ends) or ends[nearest] > run_end:
+                    continue
+            starts: Dict[int, List[int]] = {}
+            state = 0
+            position = run_start
+            for ch in run.group():
+                state = delta[state].get(ch, 0)
+                if output[state]:
+                    for index in output[state]:
+                        starts.setdefault(position - lengths[index] + 1, []).append(index)
+                position += 1
+            for start in sorted(starts):
+                yield start, starts[start]
+
+
+class ZhAutomatonMatcher:
+    """
+    Drop-in replacement for the compiled VERSE_PATTERN_ZH regex
+    Book-name candidates come from one Aho-Corasick pass; the chapter/verse
+    suffix of the pattern is only checked where a name ends. Alternatives are
+    tried in pattern order, so findall() returns exactly what re.findall would
+    """
+    PATTERN_SHAPE = re.compile(r"《\?\(([^()]*)\)(.*)", re.DOTALL)
+
+    def __init__(self, pattern: str):
+        shape = self.PATTERN_SHAPE.fullmatch(pattern)
+        if shape is None:
+            raise ValueError("ZH_MATCHER 'automaton' needs a VERSE_PATTERN_ZH of the form 《?(name|...)suffix")
+        self.names = shape.group(1).split('|')
+        # 先以零寬度前瞻找出後綴（章節）成立的位置；書名必須恰好在這些位置結束
+        self.suffix_probe = re.compile(f"(?=({shape.group(2)}))")
+        self.automaton = BookNameAutomaton(self.names)
+
+    def findall(self, text: str) -> List[Tuple[str, ...]]:
+        suffixes = {probe.start(): probe for probe in self.suffix_probe.finditer(text)}
+        if not suffixes:
+            return []
+        matches = []
+        last_end = 0
+        for start, indices in self.automaton.iter_candidates(text, list(suffixes)):
+            # 《 本身不屬於任何書名，比對起點落在它之前的情形等同於從書名開始
+            if start < last_end:
+                continue
+            for index in sorted(indices):
+                name = self.names[index]
+                suffix = suffixes.get(start + len(name))
+                if suffix is not None:
+                    matches.append((name,) + suffix.groups()[1:])
+                    last_end = suffix.end(1)
+                    break
+        return matches
+
+
+def get_verse_pattern(language: str, matcher: Optional[str] = None, source: Optional[str] = None):
+    """
+    Return the verse matcher for a language, building it on first use
+    For 'zh' this is the compiled regex or, with ZH_MATCHER = 'automaton',
+    a ZhAutomatonMatcher; both provide findall()
+    source is the pattern string (a Config's VERSE_PATTERN_ZH/EN); matcher and
+    source default to the Config class settings. Matchers are cached per
+    (language, matcher, source), so differently configured instances coexist
+    """
+    if language == 'zh':
+        matcher = matcher or Config.ZH_MATCHER
+        source = source or Config.VERSE_PATTERN_ZH
+    else:
+        matcher = 'regex'
+        source = source or Config.VERSE_PATTERN_EN
+    key = (language, matcher, source)
+    pattern = _verse_patterns.get(key)
+    if pattern is None:
+        if matcher == 'automaton':
+            pattern = ZhAutomatonMatcher(source)
+        elif matcher == 'regex':
+            pattern = re.compile(source)
+        else:
+            raise ValueError(f"Unknown ZH matcher: {matcher} (expected 'regex' or 'automaton')")
+        _verse_patterns[key] = pattern
+    return pattern
+
+# 不輸出文字內容的標籤（與 BeautifulSoup.get_text() 的行為一致）
+NON_TEXT_TAGS = frozenset(['script', 'style', 'template'])
+
+
+class TagStripper(HTMLParser):
+    """
+    Streaming, tree-free HTML-to-text converter built on html.parser
+    """
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in NON_TEXT_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in NON_TEXT_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+    def unknown_decl(self, data):
+        if data.startswith('CDATA[') and not self.skip_depth:
+            self.parts.append(data[6:])
+
+
+class LxmlTextTarget:
+    """
+    lxml parser target that collects text without building a tree
+    """
+    def __init__(self):
+        self.parts: List[str] = []
+        self.skip_depth = 0
+
+    def start(self, tag, attrib):
+        if tag in NON_TEXT_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        if tag in NON_TEXT_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+    def close(self):
+        return ''.join(self.parts)
+
+
+def bs4_to_text(content: str) -> str:
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(content, 'html.parser').get_text()
+
+
+def htmlparser_to_text(content: str) -> str:
+    stripper = TagStripper()
+    stripper.feed(content)
+    stripper.close()
+    return ''.join(stripper.parts)
+
+
+def lxml_to_text(content: str) -> str:
+    from lxml import etree
+    parser = etree.HTMLParser(target=LxmlTextTarget())
+    parser.feed(content)
+    return parser.close()
+
+
+# HTML 轉純文字的後端，由 Config.TEXT_BACKEND 選擇
+TEXT_BACKENDS = {
+    'bs4': bs4_to_text,
+    'htmlparser': htmlparser_to_text,
+    'lxml': lxml_to_text,
+}
+
+
+def html_to_text(content: str, backend: Optional[str] = None) -> str:
+    """
+    Convert HTML to plain text with the configured backend
+    """
+    backend = backend or Config.TEXT_BACKEND
+    if backend not in TEXT_BACKENDS:
+        raise ValueError(f"Unknown text backend: {backend} (expected one of {', '.join(TEXT_BACKENDS)})")
+    return TEXT_BACKENDS[backend](content)
+
+
+class ArticleDecodeError(ValueError):
+    """
+    Raised when an article's bytes cannot be decoded with any supported charset
+    """
+
+
+# 宣告的編碼名稱對應到 Python 中相容的超集編碼
+CHARSET_ALIASES: Dict[str, str] = {
+    'big5': 'cp950', 'big-5': 'cp950', 'x-x-big5': 'cp950', 'cp950': 'cp950', 'big5-hkscs': 'big5hkscs',
+    'gb2312': 'gb18030', 'gbk': 'gb18030', 'x-gbk': 'gb18030', 'gb18030': 'gb18030', 'cp936': 'gb18030',
+    'utf8': 'utf-8', 'utf-8': 'utf-8',
+}
+# 未宣告編碼且非 UTF-8 時依序嘗試的中文編碼
+FALLBACK_CHARSETS = ['cp950', 'gb18030']
+META_CHARSET_PATTERN = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([A-Za-z0-9_.:-]+)", re.IGNORECASE)
+# 繁簡常用字，用來判斷猜測的編碼是否解出有意義的中文
+COMMON_HANZI = frozenset(
+    '的一是不了在人有我他這这個个們们中來来上大為为和國国地到以說说時时要就出會会可也你對对生能而子'
+    '那得於于著着下自之年過过後后作裡里用道行所然家事成方多經经麼么去法學学如都同現现當当沒没看天'
+    '還还進进好小部其些主樣样理心本前開开但因只從从想實实日者意無无力與与把十此已使明知全三又關关'
+    '點点正將将兩两高間间由問问很最重物手向頭头文體体見见被信神主耶穌稣基督愛爱聖圣經经章節节書书'
+)
+DECODE_SAMPLE_BYTES = 65536
+
+
+def sniff_charset(data: bytes) -> Optional[str]:
+    """
+    Return the charset declared by a BOM or an HTML <meta> tag, if any
+    """
+    if data.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+    if data.startswith(b'\xff\xfe') or data.startswith(b'\xfe\xff'):
+        return 'utf-16'
+    declared = META_CHARSET_PATTERN.search(data, 0, 4096)
+    if declared is None:
+        return None
+    name = declared.group(1).decode('ascii', 'ignore').lower()
+    return CHARSET_ALIASES.get(name, name)
+
+
+def hanzi_score(text: str) -> float:
+    """
+    Share of CJK characters that are common hanzi; mis-decoded text scores near zero
+    """
+    cjk = [ch for ch in text if '\u4e00' <= ch <= '\u9fff']
+    if not cjk:
+        return 0.0
+    return sum(ch in COMMON_HANZI for ch in cjk) / len(cjk)
+
+
+def decode_article(data: bytes) -> Tuple[str, str]:
+    """
+    Decode article bytes
+    The charset comes from a BOM or <meta charset>, else UTF-8; only when both
+    fail are the FALLBACK_CHARSETS candidates scored on a sample and tried,
+    the one that looks most like Chinese first
+    Returns: (text, charset used)
+    Raises: ArticleDecodeError if no charset decodes the data
+    """
+    declared = sniff_charset(data)
+    tried = [declared] if declared else []
+    if 'utf-8' not in tried:
+        tried.append('utf-8')
+    for charset in tried:
+        try:
+            return data.decode(charset), charset
+        except (UnicodeDecodeError, LookupError):
+            continue
+    # 宣告的編碼與 UTF-8 都失敗時才取樣評分，一般檔案不必付出這筆成本
+    sample = data[:DECODE_SAMPLE_BYTES]
+    scored = []
+    for charset in FALLBACK_CHARSETS:
+        if charset in tried:
+            continue
+        try:
+            scored.append((hanzi_score(sample.decode(charset, errors='replace')), charset))
+        except LookupError:
+            continue
+    for _, charset in sorted(scored, key=lambda item: -item[0]):
+        tried.append(charset)
+        try:
+            return data.decode(charset), charset
+        except UnicodeDecodeError:
+            continue
+    raise ArticleDecodeError(f"Cannot decode as any of {', '.join(tried)}")
+
+
+class StageTimer:
+    """
+    Accumulates wall-clock seconds per pipeline stage and named counters
+    Instances are small and picklable, so worker processes return one per file
+    """
+    def __init__(self):
+        self.seconds: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] = self.seconds.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def merge(self, other: "StageTimer") -> None:
+        for name, seconds in other.seconds.items():
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+
 class VerseExtractor:
-    def __init__(self, article_path: str):
+    def __init__(self, article_path: str, timer: Optional["StageTimer"] = None, config: Optional["Config"] = None):
         self.article_path = article_path
-        # Compile regex patterns for English and Chinese
-        if Config.LANGUAGE == 'zh':
-            self.verse_pattern = re.compile(Config.VERSE_PATTERN_ZH)
-        else:
-            self.verse_pattern = re.compile(Config.VERSE_PATTERN_EN)
-        
+        self.timer = timer if timer is not None else StageTimer()
+        # 未指定 config 時使用 Config 類別上的設定（工作行程中即為本次執行的設定）
+        self.config = config if config is not None else Config
+        self.language = self.config.LANGUAGE
+        # Compiled regex patterns and normalization tables are shared per process
+        source = self.config.VERSE_PATTERN_ZH if self.language == 'zh' else self.config.VERSE_PATTERN_EN
+        self.verse_pattern = get_verse_pattern(self.language, self.config.ZH_MATCHER, source)
+        self.normalizer = get_normalizer()
+        self.reference_cache = get_reference_cache(self.language, self.config.RESOLVE_CACHE_SIZE)
+
     def normalize_verse(self, book: str, chapter: str, verse: str) -> str:
         """
         Normalize verse format to match tPerson.csv format
         """
-        # Convert book name to standard format (e.g., "Exodus" -> "Exod")
-        book = book.strip().lower()
-        chapter = chapter.strip().lower()
-        book_mapping = {
-            # 英文
-            'exodus': 'Exod',
-            'genesis': 'Gen',
-            'leviticus': 'Lev',
-            'numbers': 'Num',
-            'deuteronomy': 'Deut',
-            'joshua': 'Josh',
-            'judges': 'Judg',
-            'ruth': 'Ruth',
-            '1 samuel': '1Sam',
-            '2 samuel': '2Sam',
-            '1 kings': '1Kgs',
-            '2 kings': '2Kgs',
-            '1 chronicles': '1Chr',
-            '2 chronicles': '2Chr',
-            'ezra': 'Ezra',
-            'nehemiah': 'Neh',
-            'esther': 'Esth',
-            'job': 'Job',
-            'psalms': 'Ps',
-            'proverbs': 'Prov',
-            'ecclesiastes': 'Eccl',
-            'song of solomon': 'Song',
-            'isaiah': 'Isa',
-            'jeremiah': 'Jer',
-            'lamentations': 'Lam',
-            'ezekiel': 'Ezek',
-            'daniel': 'Dan',
-            'hosea': 'Hos',
-            'joel': 'Joel',
-            'amos': 'Amos',
-            'obadiah': 'Obad',
-            'jonah': 'Jonah',
-            'micah': 'Mic',
-            'nahum': 'Nah',
-            'habakkuk': 'Hab',
-            'zephaniah': 'Zeph',
-            'haggai': 'Hag',
-            'zechariah': 'Zech',
-            'malachi': 'Mal',
-            'matthew': 'Matt',
-            'mark': 'Mark',
-            'luke': 'Luke',
-            'john': 'John',
-            'acts': 'Acts',
-            'romans': 'Rom',
-            '1 corinthians': '1Cor',
-            '2 corinthians': '2Cor',
-            'galatians': 'Gal',
-            'ephesians': 'Eph',
-            'philippians': 'Phil',
-            'colossians': 'Col',
-            '1 thessalonians': '1Thess',
-            '2 thessalonians': '2Thess',
-            '1 timothy': '1Tim',
-            '2 timothy': '2Tim',
-            'titus': 'Titus',
-            'philemon': 'Phlm',
-            'hebrews': 'Heb',
-            'james': 'James',
-            '1 peter': '1Pet',
-            '2 peter': '2Pet',
-            '1 john': '1John',
-            '2 john': '2John',
-            '3 john': '3John',
-            'jude': 'Jude',
-            'revelation': 'Rev',
-            # 繁體中文
-            '創世記': 'Gen',
-            '出埃及記': 'Exod',
-            '利未記': 'Lev',
-            '民數記': 'Num',
-            '申命記': 'Deut',
-            '約書亞記': 'Josh',
-            '士師記': 'Judg',
-            '路得記': 'Ruth',
-            '撒母耳記上': '1Sam',
-            '撒母耳記下': '2Sam',
-            '列王紀上': '1Kgs',
-            '列王紀下': '2Kgs',
-            '歷代志上': '1Chr',
-            '歷代志下': '2Chr',
-            '以斯拉記': 'Ezra',
-            '尼希米記': 'Neh',
-            '以斯帖記': 'Esth',
-            '約伯記': 'Job',
-            '詩篇': 'Ps',
-            '箴言': 'Prov',
-            '傳道書': 'Eccl',
-            '雅歌': 'Song',
-            '以賽亞書': 'Isa',
-            '耶利米書': 'Jer',
-            '耶利米哀歌': 'Lam',
-            '以西結書': 'Ezek',
-            '但以理書': 'Dan',
-            '何西阿書': 'Hos',
-            '約珥書': 'Joel',
-            '阿摩司書': 'Amos',
-            '俄巴底亞書': 'Obad',
-            '約拿書': 'Jonah',
-            '彌迦書': 'Mic',
-            '那鴻書': 'Nah',
-            '哈巴谷書': 'Hab',
-            '西番雅書': 'Zeph',
-            '哈該書': 'Hag',
-            '撒迦利亞書': 'Zech',
-            '瑪拉基書': 'Mal',
-            '馬太福音': 'Matt',
-            '馬可福音': 'Mark',
-            '路加福音': 'Luke',
-            '約翰福音': 'John',
-            '使徒行傳': 'Acts',
-            '羅馬書': 'Rom',
-            '哥林多前書': '1Cor',
-            '哥林多後書': '2Cor',
-            '加拉太書': 'Gal',
-            '以弗所書': 'Eph',
-            '腓立比書': 'Phil',
-            '歌羅西書': 'Col',
-            '帖撒羅尼迦前書': '1Thess',
-            '帖撒羅尼迦後書': '2Thess',
-            '提摩太前書': '1Tim',
-            '提摩太後書': '2Tim',
-            '提多書': 'Titus',
-            '腓利門書': 'Phlm',
-            '希伯來書': 'Heb',
-            '雅各書': 'James',
-            '彼得前書': '1Pet',
-            '彼得後書': '2Pet',
-            '約翰一書': '1John',
-            '約翰二書': '2John',
-            '約翰三書': '3John',
-            '猶大書': 'Jude',
-            '啟示錄': 'Rev',
-            # 繁體中文縮寫
-            '創': 'Gen',
-            '出': 'Exod',
-            '利': 'Lev',
-            '民': 'Num',
-            '申': 'Deut',
-            '書': 'Josh',
-            '士': 'Judg',
-            '得': 'Ruth',
-            '撒上': '1Sam',
-            '撒下': '2Sam',
-            '王上': '1Kgs',
-            '王下': '2Kgs',
-            '代上': '1Chr',
-            '代下': '2Chr',
-            '拉': 'Ezra',
-            '尼': 'Neh',
-            '斯': 'Esth',
-            '伯': 'Job',
-            '詩': 'Ps',
-            '箴': 'Prov',
-            '傳': 'Eccl',
-            '雅': 'Song',
-            '賽': 'Isa',
-            '耶': 'Jer',
-            '哀': 'Lam',
-            '結': 'Ezek',
-            '但': 'Dan',
-            '何': 'Hos',
-            '珥': 'Joel',
-            '摩': 'Amos',
-            '俄': 'Obad',
-            '拿': 'Jonah',
-            '彌': 'Mic',
-            '鴻': 'Nah',
-            '哈': 'Hab',
-            '番': 'Zeph',
-            '該': 'Hag',
-            '亞': 'Zech',
-            '瑪': 'Mal',
-            '太': 'Matt',
-            '可': 'Mark',
-            '路': 'Luke',
-            '約': 'John',
-            '徒': 'Acts',
-            '羅': 'Rom',
-            '林前': '1Cor',
-            '林後': '2Cor',
-            '加': 'Gal',
-            '弗': 'Eph',
-            '腓': 'Phil',
-            '西': 'Col',
-            '帖前': '1Thess',
-            '帖後': '2Thess',
-            '提前': '1Tim',
-            '提後': '2Tim',
-            '多': 'Titus',
-            '門': 'Phlm',
-            '來': 'Heb',
-            '雅各': 'James',
-            '彼前': '1Pet',
-            '彼後': '2Pet',
-            '約一': '1John',
-            '約二': '2John',
-            '約三': '3John',
-            '猶': 'Jude',
-            '啟': 'Rev'
-            
-        }
-        
-        booksw = str
-        # Try to find a match in the mapping
-        for key, value in book_mapping.items():
-            if book.startswith(key):
-                # return f"{value} {chapter}:{verse}"
-                booksw = value
-
-        # 中文數字轉換
-        chinese_numbers = {
-            '一': '1', '二': '2', '三': '3', '四': '4', '五': '5',
-            '六': '6', '七': '7', '八': '8', '九': '9', '十': '10',
-            '十一': '11', '十二': '12', '十三': '13', '十四': '14', '十五': '15',
-            '十六': '16', '十七': '17', '十八': '18', '十九': '19', 
-            '廿一' : '21','廿二' : '22','廿三' : '23','廿四' : '24','廿五' : '25',
-            '廿六' : '26','廿七' : '27','廿八' : '28','廿九' : '29','廿' : '20',
-            '卅ㄧ' : '31','卅二' : '32','卅三' : '33','卅四' : '34','卅五' : '35',
-            '卅六' : '36','卅七' : '37','卅八' : '38','卅九' : '39','卅' : '30', 
-            '二十一': '21', '二十二': '22', '二十三': '23', '二十四': '24', '二十五': '25',
-            '二十六': '26', '二十七': '27', '二十八': '28', '二十九': '29', '三十': '30',
-            '三十一': '31', '三十二': '32', '三十三': '33', '三十四': '34', '三十五': '35',
-            '三十六': '36', '三十七': '37', '三十八': '38', '三十九': '39', '四十': '40',
-            '四十一': '41', '四十二': '42', '四十三': '43', '四十四': '44', '四十五': '45',
-            '四十六': '46', '四十七': '47', '四十八': '48', '四十九': '49', '五十': '50',
-            '五十一': '51', '五十二': '52', '五十三': '53', '五十四': '54', '五十五': '55',
-            '五十六': '56', '五十七': '57', '五十八': '58', '五十九': '59', '六十': '60',
-            '六十一': '61', '六十二': '62', '六十三': '63', '六十四': '64', '六十五': '65',
-            '六十六': '66', '六十七': '67', '六十八': '68', '六十九': '69', '七十': '70',
-            '七十一': '71', '七十二': '72', '七十三': '73', '七十四': '74', '七十五': '75',
-            '七十六': '76', '七十七': '77', '七十八': '78', '七十九': '79', '八十': '80',
-            '八十一': '81', '八十二': '82', '八十三': '83', '八十四': '84', '八十五': '85',
-            '八十六': '86', '八十七': '87', '八十八': '88', '八十九': '89', '九十': '90',
-            '九十一': '91', '九十二': '92', '九十三': '93', '九十四': '94', '九十五': '95',
-            '九十六': '96', '九十七': '97', '九十八': '98', '九十九': '99', '一百': '100',
-            '一百零一': '101', '一百零二': '102', '一百零三': '103', '一百零四': '104', '一百零五': '105',
-            '一百零六': '106', '一百零七': '107', '一百零八': '108', '一百零九': '109', 
-            '二一': '21', '二二': '22', '二十三': '23', '二十四': '24', '二十五': '25',
-            '二六': '26', '二七': '27', '二八': '28', '二九': '29', '三十': '30',
-            '三一': '31', '三二': '32', '三三': '33', '三四': '34', '三五': '35',
-            '三六': '36', '三七': '37', '三八': '38', '三九': '39', '四十': '40',
-            '四一': '41', '四二': '42', '四三': '43', '四四': '44', '四五': '45',
-            '四六': '46', '四七': '47', '四八': '48', '四九': '49', '五十': '50',
-            '五一': '51', '五二': '52', '五三': '53', '五四': '54', '五五': '55',
-            '五六': '56', '五七': '57', '五八': '58', '五九': '59', '六十': '60',
-            '六一': '61', '六二': '62', '六三': '63', '六四': '64', '六五': '65',
-            '六六': '66', '六七': '67', '六八': '68', '六九': '69', '七十': '70',
-            '七一': '71', '七二': '72', '七三': '73', '七四': '74', '七五': '75',
-            '七六': '76', '七七': '77', '七八': '78', '七九': '79', '八十': '80',
-            '八一': '81', '八二': '82', '八三': '83', '八四': '84', '八五': '85',
-            '八六': '86', '八七': '87', '八八': '88', '八九': '89', '九十': '90',
-            '九一': '91', '九二': '92', '九三': '93', '九四': '94', '九五': '95',
-            '九六': '96', '九七': '97', '九八': '98', '九九': '99','一○○': '100',
-            '一○一': '101', '一○二': '102', '一○三': '103', '一○四': '104', '一○五': '105',
-            '一○六': '106', '一○七': '107', '一○八': '108', '一○九': '109','一百一十': '110',
-            '一一一': '111', '一一二': '112', '一一三': '113', '一一四': '114', '一一五': '115',
-            '一一六': '116', '一一七': '117', '一一八': '118', '一一九': '119', '一二○': '120',
-            '一二一': '121', '一二二': '122', '一二三': '123', '一二四': '124', '一二五': '125',
-            '一二六': '126', '一二七': '127', '一二八': '128', '一二九': '129', '一三○': '130',
-            '一三一': '131', '一三二': '132', '一三三': '133', '一三四': '134', '一三五': '135',
-            '一三六': '136', '一三七': '137', '一三八': '138', '一三九': '139', '一四○': '140',
-            '一四一': '141', '一四二': '142', '一四三': '143', '一四四': '144', '一四五': '145',
-            '一四六': '146', '一四七': '147', '一四八': '148', '一四九': '149', '一五○': '150',
-            '一百一十': '110','廿' : '20',
-            '一百一十一': '111', '一百一十二': '112', '一百一十三': '113', '一百一十四': '114', '一百一十五': '115',
-            '一百一十六': '116', '一百一十七': '117', '一百一十八': '118', '一百一十九': '119', '一百二十': '120',
-            '一百二十一': '121', '一百二十二': '122', '一百二十三': '123', '一百二十四': '124', '一百二十五': '125',
-            '一百二十六': '126', '一百二十七': '127', '一百二十八': '128', '一百二十九': '129', '一百三十': '130',
-            '一百三十一': '131', '一百三十二': '132', '一百三十三': '133', '一百三十四': '134', '一百三十五': '135',
-            '一百三十六': '136', '一百三十七': '137', '一百三十八': '138', '一百三十九': '139', '一百四十': '140',
-            '一百四十一': '141', '一百四十二': '142', '一百四十三': '143', '一百四十四': '144', '一百四十五': '145',
-            '一百四十六': '146', '一百四十七': '147', '一百四十八': '148', '一百四十九': '149', '一百五十': '150'
-        }
-        
-        chaptersw = chapter if chapter != '' else 1
-        # Sort chinese_numbers items by key length in descending order to match longer patterns first
-        sorted_chinese_numbers = sorted(chinese_numbers.items(), key=lambda x: len(x[0]), reverse=True)
-        for key, value in sorted_chinese_numbers:
-            if chapter.startswith(key):
-                chaptersw = value
-                break
-        # ... existing code ...
-        if Config.LANGUAGE == 'zh':
-            return f"{booksw} {chaptersw}:{verse}"
-        else:
-            return f"{booksw} {chapter}:{verse}"
-        # If no match found, return the original format
-        # return f"{book} {chapter}:{verse}"
-        
-    def extract_verses(self) -> List[str]:
+        return self.normalizer.normalize(book, chapter, verse, self.language)
+
+    def expand_verse(self, book: str, chapter: str, verse: str, tail: str = '') -> Iterator[str]:
+        """
+        Expand a verse, range or list reference into normalized verses
+        """
+        return self.normalizer.expand(book, chapter, verse, tail, self.language)
+
+    def decode(self, data: bytes) -> str:
+        """
+        Decode raw article bytes (see decode_article) with unified line endings
+        Raises: ArticleDecodeError
+        """
+        timer = self.timer
+        with timer.stage('decode'):
+            try:
+                content, charset = decode_article(data)
+            except ArticleDecodeError:
+                timer.count('undecodable')
+                raise
+            # 與文字模式開檔相同，統一換行符號
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        timer.count(f"charset_{charset}")
+        return content
+
+    def html_to_text(self, content: str) -> str:
+        with self.timer.stage('html_to_text'):
+            return html_to_text(content, self.config.TEXT_BACKEND)
+
+    def extract_from_text(self, text: str) -> List[str]:
+        """
+        Find and normalize the verse references in plain text
+        Returns: List of verses in format "Book Chapter:Verse"
+        """
+        timer = self.timer
+        # Extract verses using regex
+        with timer.stage('regex_scan'):
+            verses = self.verse_pattern.findall(text)
+        logger.debug("Extracted %d, sample: %s", len(verses), verses)
+        # Normalize verses; repeated references are served from the LRU cache
+        cache = self.reference_cache
+        with timer.stage('normalize'):
+            formatted_verses = []
+            for match in verses:
+                keys = cache.get(match)
+                if keys is None:
+                    # 正規化結果以 intern 字串保存，各文件的相同經文共用同一個物件
+                    keys = cache.put(match, tuple(sys.intern(key) for key in self.expand_verse(*match)))
+                formatted_verses.extend(keys)
+        cache.take_counts(timer, 'resolve')
+        timer.count('matches', len(verses))
+        timer.count('verses', len(formatted_verses))
+        return formatted_verses
+
+    def extract_verses(self, data: Optional[bytes] = None) -> List[str]:
         """
         Extract Bible verses from HTML articles
+        data is the file content if it was already read (e.g. by the prefetch
+        pipeline); otherwise the file is read here
+        Stage timings and byte/match counts are recorded in self.timer
         Returns: List of verses in format "Book Chapter:Verse"
         """
+        timer = self.timer
         try:
-            # print(f"Processing file: {self.article_path}")
-            with open(self.article_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                # Use BeautifulSoup for HTML/HTM, plain text for .txt
-                if Path(self.article_path).suffix.lower() in ['.html', '.htm']:
-                    soup = BeautifulSoup(content, 'html.parser')
-                    text = soup.get_text()
-                # else:
-                # text = content
-                # print(text[:1000])  # Print first 1000 characters for debugging
-                # Extract verses using regex
-                verses = self.verse_pattern.findall(text)
-                print(f"Extracted {len(verses)}, sample: {verses[:]}")
-                # Normalize verses
-                formatted_verses = [self.normalize_verse(book, chapter, verse) for book, chapter, verse in verses]
-                print(f"Found {len(formatted_verses)} verses in {self.article_path}")
-                if formatted_verses:
-                    print(f"Sample verses found: {formatted_verses[:]}")
-                return formatted_verses
+            if data is None:
+                with timer.stage('read'):
+                    with open(self.article_path, 'rb') as file:
+                        data = file.read()
+                timer.count('bytes', len(data))
+            content = self.decode(data)
+            # Strip tags for HTML/HTM, plain text for .txt
+            if Path(self.article_path).suffix.lower() in ['.html', '.htm']:
+                text = self.html_to_text(content)
+            else:
+                text = content
+            formatted_verses = self.extract_from_text(text)
+            logger.debug("Found %d verses in %s: %s", len(formatted_verses), self.article_path, formatted_verses)
+            return formatted_verses
+        except ArticleDecodeError:
+            # 交由呼叫端記錄並列入執行摘要，也不會被寫入快取
+            raise
         except Exception as e:
             logging.error(f"Error extracting verses from {self.article_path}: {str(e)}")
-            print(f"Error processing {self.article_path}: {str(e)}")
+            logger.error(f"Error processing {self.article_path}: {str(e)}")
             return []
 
 class VerseCounter:
@@ -402,43 +1216,242 @@ class VerseCounter:
 
 class PersonVerseMatcher:
     def __init__(self, tperson_file: str):
-        self.person_verses: Dict[str, List[Dict]] = {}
+        # 人物表：每位人物只存一筆；經文索引對應到人物表的整數位置
+        self.persons: List[Dict] = []
+        self.person_verses: Dict[str, np.ndarray] = {}
         self.load_person_verses(tperson_file)
         
     def load_person_verses(self, file_path: str) -> None:
         """
         Load and parse tPerson.csv
+        Builds the person table and a verse -> person-index array mapping
+        with vectorized split/explode instead of a per-row Python loop
         """
         try:
-            # print(f"Loading person verses from {file_path}")
-            df = pd.read_csv(file_path)
-            # print(f"Loaded {len(df)} rows from tPerson.csv")
+            df = pd.read_csv(file_path).reset_index(drop=True)
+            self.persons = df[['PersonID', 'Name', 'ZhName']].to_dict('records')
             
-            for _, row in df.iterrows():
-                verses = str(row['Verses']).split(';')
-                for verse in verses:
-                    verse = verse.strip()
-                    if verse:
-                        if verse not in self.person_verses:
-                            self.person_verses[verse] = []
-                        self.person_verses[verse].append({
-                            'PersonID': row['PersonID'],
-                            'Name': row['Name'],
-                            'ZhName': row['ZhName']
-                        })
-            print(f"Loaded {len(self.person_verses)} unique verses from tPerson.csv")
-            if self.person_verses:
-                print(f"Sample person verses: {list(self.person_verses.items())[:3]}")
+            verses = df['Verses'].dropna().astype(str).str.split(';').explode().str.strip()
+            verses = verses[verses.notna() & (verses != '')]
+            person_index = verses.index.to_numpy(dtype=np.int32)
+            # 依經文分組並保留 tPerson.csv 的原始順序
+            codes, unique_verses = pd.factorize(verses.to_numpy())
+            order = np.argsort(codes, kind='stable')
+            bounds = np.cumsum(np.bincount(codes, minlength=len(unique_verses)))[:-1]
+            self.person_verses = dict(zip(unique_verses.tolist(), np.split(person_index[order], bounds)))
+            logger.info(f"Loaded {len(self.person_verses)} unique verses for {len(self.persons)} persons from tPerson.csv")
+            if self.person_verses and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Sample person verses: {[(verse, self.find_matching_persons(verse)) for verse in list(self.person_verses)[:3]]}")
         except Exception as e:
             logging.error(f"Error loading person verses from {file_path}: {str(e)}")
-            print(f"Error loading person verses: {str(e)}")
+            logger.error(f"Error loading person verses: {str(e)}")
             
     def find_matching_persons(self, verse: str) -> List[Dict]:
         """
         Find biblical figures associated with given verse
         Returns: List of matching person dictionaries
         """
-        return self.person_verses.get(verse, [])
+        person_index = self.person_verses.get(verse)
+        if person_index is None:
+            return []
+        return [self.persons[i] for i in person_index]
+
+class MmapPersonVerseMatcher:
+    """
+    Verse -> person lookup on a prebuilt binary index (see build_person_index)
+    The index is memory-mapped read-only, so loading costs almost nothing and
+    its pages are shared by every process that opens the same file
+
+    File layout (little-endian):
+        header   8s magic, u32 version, n_verses, n_refs, n_persons, persons_len, extra_len, source_len
+        ids      u32[n_verses]      sorted verse IDs (see verse_id)
+        offsets  u32[n_verses + 1]  slice of refs belonging to each verse ID
+        refs     u32[n_refs]        person table indices
+        persons  JSON [[PersonID, Name, ZhName], ...]
+        extra    JSON {verse: [person indices]} for keys verse_id cannot encode
+        source   JSON {path, size, mtime_ns, sha256} of the tPerson.csv it was built from
+    """
+    MAGIC = b'BVIDX\0\0\0'
+    # 3：帶前導零的鍵不再編成 verse ID，改存於 extra
+    VERSION = 3
+    HEADER = struct.Struct('<8s7I')
+
+    def __init__(self, index_file: str):
+        self.index_file = index_file
+        with open(index_file, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = struct.unpack_from('<8sI', self._mmap, 0)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"Unsupported person index {index_file} (version {version}, expected {self.VERSION})")
+        _, _, n_verses, n_refs, n_persons, persons_len, extra_len, _ = self.HEADER.unpack_from(self._mmap, 0)
+        offset = self.HEADER.size
+        self.ids = np.frombuffer(self._mmap, dtype='<u4', count=n_verses, offset=offset)
+        offset += 4 * n_verses
+        self.offsets = np.frombuffer(self._mmap, dtype='<u4', count=n_verses + 1, offset=offset)
+        offset += 4 * (n_verses + 1)
+        self.refs = np.frombuffer(self._mmap, dtype='<u4', count=n_refs, offset=offset)
+        offset += 4 * n_refs
+        self._persons_span = (offset, offset + persons_len)
+        self.extra = json.loads(self._mmap[offset + persons_len:offset + persons_len + extra_len])
+        self.person_count = n_persons
+        self._persons: Optional[List[Dict]] = None
+        logger.info(f"Mapped {n_verses + len(self.extra)} unique verses for {n_persons} persons from {index_file}")
+
+    @property
+    def persons(self) -> List[Dict]:
+        # 人物表在第一次查詢時才解碼
+        if self._persons is None:
+            start, end = self._persons_span
+            self._persons = [{'PersonID': person_id, 'Name': name, 'ZhName': zh_name}
+                             for person_id, name, zh_name in json.loads(self._mmap[start:end])]
+        return self._persons
+
+    def find_matching_persons(self, verse: str) -> List[Dict]:
+        """
+        Find biblical figures associated with given verse
+        Returns: List of matching person dictionaries
+        """
+        vid = verse_id(verse)
+        if vid is None:
+            person_index = self.extra.get(verse, [])
+        else:
+            position = int(np.searchsorted(self.ids, vid))
+            if position == len(self.ids) or self.ids[position] != vid:
+                return []
+            person_index = self.refs[self.offsets[position]:self.offsets[position + 1]]
+        persons = self.persons
+        return [persons[i] for i in person_index]
+
+
+def build_person_index(tperson_file: str, index_file: str) -> None:
+    """
+    Compile tPerson.csv into the binary index read by MmapPersonVerseMatcher
+    The file is written to a temporary name and renamed, so readers never see a partial index
+    """
+    matcher = PersonVerseMatcher(tperson_file)
+    if not matcher.persons:
+        raise ValueError(f"No persons loaded from {tperson_file}")
+    encoded = []
+    extra = {}
+    for verse, person_index in matcher.person_verses.items():
+        vid = verse_id(verse)
+        if vid is None:
+            extra[verse] = person_index.tolist()
+        else:
+            encoded.append((vid, person_index))
+    encoded.sort(key=lambda item: item[0])
+    ids = np.array([vid for vid, _ in encoded], dtype='<u4')
+    lengths = np.array([len(person_index) for _, person_index in encoded], dtype='<u4')
+    offsets = np.concatenate([np.zeros(1, dtype='<u4'), np.cumsum(lengths, dtype='<u4')])
+    refs = (np.concatenate([person_index for _, person_index in encoded]) if encoded
+            else np.zeros(0)).astype('<u4')
+    persons = json.dumps([[person['PersonID'], person['Name'], person['ZhName']] for person in matcher.persons],
+                         ensure_ascii=False).encode('utf-8')
+    extra_blob = json.dumps(extra, ensure_ascii=False).encode('utf-8')
+    st = os.stat(tperson_file)
+    source_blob = json.dumps({'path': os.path.abspath(tperson_file), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                              'sha256': file_digest(tperson_file)}, ensure_ascii=False).encode('utf-8')
+    header = MmapPersonVerseMatcher.HEADER.pack(
+        MmapPersonVerseMatcher.MAGIC, MmapPersonVerseMatcher.VERSION,
+        len(ids), len(refs), len(matcher.persons), len(persons), len(extra_blob), len(source_blob)
+    )
+    tmp_file = f"{index_file}.tmp{os.getpid()}"
+    with open(tmp_file, 'wb') as file:
+        for chunk in (header, ids.tobytes(), offsets.tobytes(), refs.tobytes(), persons, extra_blob, source_blob):
+            file.write(chunk)
+    os.replace(tmp_file, index_file)
+    logger.info(f"Person index written to {index_file} ({len(ids)} verse IDs, {len(extra)} other verses, "
+          f"{len(matcher.persons)} persons)")
+
+
+def read_index_source(index_file: str) -> Optional[Dict]:
+    """
+    Read the tPerson.csv description stored in a person index
+    Returns: {path, size, mtime_ns, sha256}, or None for an index of another version
+    Raises: ValueError if the file is not a person index
+    """
+    header = MmapPersonVerseMatcher.HEADER
+    with open(index_file, 'rb') as file:
+        data = file.read(header.size)
+        magic, version = struct.unpack_from('<8sI', data)
+        if magic != MmapPersonVerseMatcher.MAGIC:
+            raise ValueError(f"{index_file} is not a person index")
+        if version != MmapPersonVerseMatcher.VERSION:
+            return None
+        _, _, n_verses, n_refs, _, persons_len, extra_len, source_len = header.unpack(data)
+        file.seek(header.size + 4 * (2 * n_verses + 1 + n_refs) + persons_len + extra_len)
+        return json.loads(file.read(source_len))
+
+
+def index_matches_source(source: Optional[Dict], tperson_file: str) -> bool:
+    """
+    Check that an index was built from the current content of tperson_file
+    Size and mtime are compared first; the SHA-256 is only computed when the
+    mtime differs (e.g. the CSV was copied or touched)
+    """
+    if source is None:
+        return False
+    st = os.stat(tperson_file)
+    if st.st_size != source['size']:
+        return False
+    return st.st_mtime_ns == source['mtime_ns'] or file_digest(tperson_file) == source['sha256']
+
+
+def open_person_matcher(config: Config):
+    """
+    Open the verse -> person lookup for a run
+    Uses the memory-mapped index when PERSON_INDEX_FILE exists and was built
+    from the current TPERSON_FILE, otherwise parses tPerson.csv
+    """
+    index_file = config.PERSON_INDEX_FILE
+    if index_file and os.path.exists(index_file):
+        if not os.path.exists(config.TPERSON_FILE):
+            return MmapPersonVerseMatcher(index_file)
+        try:
+            matches = index_matches_source(read_index_source(index_file), config.TPERSON_FILE)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Cannot read person index {index_file} ({str(e)}), loading the CSV instead")
+        else:
+            if matches:
+                return MmapPersonVerseMatcher(index_file)
+            logger.warning(f"Person index {index_file} was not built from the current {config.TPERSON_FILE}, "
+                           f"loading the CSV instead (rebuild it with `index build`)")
+    return PersonVerseMatcher(config.TPERSON_FILE)
+
+
+def person_index_stats(index_file: str, tperson_file: str = '') -> Dict:
+    """
+    Summarize a person index from its header and ID table (no pandas/numpy import)
+    Returns: dict of counts, file size, the source CSV and whether the index is stale for tperson_file
+    """
+    header = MmapPersonVerseMatcher.HEADER
+    source = read_index_source(index_file)
+    if source is None:
+        raise ValueError(f"{index_file} was built by another version; rebuild it with `index build`")
+    with open(index_file, 'rb') as file:
+        _, version, n_verses, n_refs, n_persons, persons_len, extra_len, _ = header.unpack(file.read(header.size))
+        ids = array('I', file.read(4 * n_verses))
+        file.seek(header.size + 4 * (2 * n_verses + 1 + n_refs) + persons_len)
+        extra = json.loads(file.read(extra_len))
+    if sys.byteorder != 'little':
+        ids.byteswap()
+    books = {vid >> 16 for vid in ids}
+    st = os.stat(index_file)
+    return {
+        'index_file': index_file,
+        'version': version,
+        'persons': n_persons,
+        'verse_ids': n_verses,
+        'other_verses': len(extra),
+        'person_refs': n_refs,
+        'books': len(books),
+        'persons_per_verse': n_refs / n_verses if n_verses else 0.0,
+        'size_bytes': st.st_size,
+        'built': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(st.st_mtime)),
+        'source': source['path'],
+        'stale': bool(tperson_file) and os.path.exists(tperson_file) and not index_matches_source(source, tperson_file),
+    }
+
 
 class ErrorLogger:
     def __init__(self, log_file: str = "bible_verse_analyzer.log"):
@@ -455,95 +1468,1569 @@ class ErrorLogger:
         """
         logging.error(f"{error_type}: {message}")
 
-def main():
+def analysis_fingerprint(language: str) -> str:
+    """
+    Fingerprint of everything that determines an article's verse counts
+    Cached counts are discarded when the regex, tables or language change
+    """
+    settings = {
+        'normalization_version': NORMALIZATION_VERSION,
+        'charsets': [FALLBACK_CHARSETS, CHARSET_ALIASES],
+        'charset_scoring': [sorted(COMMON_HANZI), DECODE_SAMPLE_BYTES],
+        'language': language,
+        'text_backend': Config.TEXT_BACKEND,
+        'pattern': Config.VERSE_PATTERN_ZH if language == 'zh' else Config.VERSE_PATTERN_EN,
+        'book_mapping': BOOK_MAPPING,
+        'chinese_numerals': [CHINESE_DIGITS, CHINESE_UNITS, CHINESE_TENS],
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+# 讀取內容之前取得的 (mtime_ns, size)
+FileStat = Tuple[int, int]
+# FileStat 加上同一份內容的 SHA-256，即快取與計數一起存下的檔案簽章
+FileSignature = Tuple[int, int, str]
+
+
+def file_digest(path: str) -> str:
+    """
+    SHA-256 of a file's content
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class VerseCache:
+    """
+    Persistent SQLite cache of per-file verse counts
+    Entries are keyed by path and validated by mtime, size and content hash
+    """
+    SCHEMA_VERSION = 1
+
+    def __init__(self, cache_file: str, fingerprint: str):
+        self.cache_file = cache_file
+        self.hits = 0
+        self.misses = 0
+        self._pending = 0
+        self.conn = sqlite3.connect(cache_file)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "digest TEXT NOT NULL, verse_counts TEXT NOT NULL)"
+        )
+        stored = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+        expected = {'schema_version': str(self.SCHEMA_VERSION), 'fingerprint': fingerprint}
+        if stored != expected:
+            if stored:
+                logger.info(f"Analysis settings changed, clearing cache {cache_file}")
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", expected.items())
+        self.conn.commit()
+
+    def lookup(self, path: str) -> Optional[Dict[str, int]]:
+        """
+        Look up the cached verse counts of a file
+        The content hash is only computed for a known file whose mtime changed
+        but whose size did not; new files are hashed by the worker that reads them
+        Returns: verse_counts, or None on a miss
+        """
+        row = self.conn.execute(
+            "SELECT mtime_ns, size, digest, verse_counts FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        st = os.stat(path)
+        if row[0] == st.st_mtime_ns and row[1] == st.st_size:
+            self.hits += 1
+            return json.loads(row[3])
+        if row[1] == st.st_size and row[2] == file_digest(path):
+            self.conn.execute("UPDATE files SET mtime_ns = ? WHERE path = ?", (st.st_mtime_ns, path))
+            self.hits += 1
+            return json.loads(row[3])
+        self.misses += 1
+        return None
+
+    def store(self, path: str, signature: FileSignature, verse_counts: Dict[str, int]) -> None:
+        """
+        Record the verse counts of a freshly analyzed file
+        signature is the mtime/size taken before the file was read plus the
+        digest of the bytes read, so a file rewritten during the analysis no
+        longer matches it on the next lookup
+        """
+        mtime_ns, size, digest = signature
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, mtime_ns, size, digest, verse_counts) VALUES (?, ?, ?, ?, ?)",
+            (path, mtime_ns, size, digest, json.dumps(verse_counts, ensure_ascii=False))
+        )
+        self._pending += 1
+        if self._pending >= 500:
+            self.conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+class RunCheckpoint:
+    """
+    Periodic checkpoint of a corpus scan, for resuming after a crash or kill
+    Files are completed in processing order, so a checkpoint is the verse
+    counts of a prefix of the file list: numbered JSON segments plus a
+    manifest naming them. Segments and manifest are written to a temporary
+    file and moved into place with os.replace, so a checkpoint is never
+    seen half-written. Resuming replays the recorded counts through the
+    normal output path, which makes the outputs identical to an
+    uninterrupted run
+    """
+    VERSION = 1
+
+    def __init__(self, directory: str, fingerprint: str, every: int):
+        self.directory = Path(directory)
+        self.fingerprint = fingerprint
+        self.every = max(1, every)
+        self.segments: List[str] = []
+        self.completed = 0
+        self._pending: List[Dict] = []
+
+    def _write_json(self, name: str, value) -> None:
+        path = self.directory / name
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as file:
+            json.dump(value, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, path)
+
+    def reset(self) -> None:
+        """
+        Start a new checkpoint, discarding any previous one
+        """
+        self.remove()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def resume(self, article_files: List[str]) -> List[Dict]:
+        """
+        Load the checkpoint of an interrupted run over the same files and settings
+        Returns: the recorded file results in processing order (empty when
+        there is no usable checkpoint, in which case a new one is started)
+        """
+        try:
+            with open(self.directory / 'manifest.json', encoding='utf-8') as file:
+                manifest = json.load(file)
+            records: List[Dict] = []
+            for name in manifest['segments']:
+                with open(self.directory / name, encoding='utf-8') as file:
+                    records.extend(json.load(file))
+        except (OSError, ValueError, KeyError) as e:
+            logger.info(f"No usable checkpoint in {self.directory} ({str(e)}), starting from the beginning")
+            self.reset()
+            return []
+        if manifest.get('version') != self.VERSION or manifest.get('fingerprint') != self.fingerprint:
+            logger.info(f"Checkpoint {self.directory} was made with other analysis settings, starting over")
+            self.reset()
+            return []
+        if [record['file'] for record in records] != article_files[:len(records)]:
+            logger.info(f"Checkpoint {self.directory} does not match the current file list, starting over")
+            self.reset()
+            return []
+        self.segments = list(manifest['segments'])
+        self.completed = len(records)
+        logger.info(f"Resuming after {len(records)} completed files from {self.directory}")
+        return records
+
+    def record(self, html_file: str, verse_counts: Dict[str, int], error: Optional[str], undecodable: bool) -> None:
+        self._pending.append({'file': html_file, 'verse_counts': verse_counts,
+                              'error': error, 'undecodable': undecodable})
+        if len(self._pending) >= self.every:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write the pending file results as a new segment and publish it in the manifest
+        """
+        if not self._pending:
+            return
+        name = f"segment_{len(self.segments):05d}.json"
+        self._write_json(name, self._pending)
+        self.segments.append(name)
+        self.completed += len(self._pending)
+        self._pending = []
+        self._write_json('manifest.json', {
+            'version': self.VERSION, 'fingerprint': self.fingerprint,
+            'segments': self.segments, 'files': self.completed,
+        })
+
+    def remove(self) -> None:
+        """
+        Delete the checkpoint files (manifest and segments) and the directory if nothing else is left in it
+        """
+        if not self.directory.is_dir():
+            return
+        # 只刪除檢查點自己的檔案；CHECKPOINT_DIR 可能指向放有其他檔案的目錄
+        for pattern in ('manifest.json', 'manifest.json.tmp', 'segment_*.json', 'segment_*.json.tmp'):
+            for path in self.directory.glob(pattern):
+                if path.is_file():
+                    path.unlink()
+        if not any(self.directory.iterdir()):
+            self.directory.rmdir()
+
+
+def list_article_files(article_dir: Path) -> List[Path]:
+    """
+    List the articles to analyze, in processing order
+    Returns: All .htm files found recursively, followed by all .html files
+    """
+    # Search for all .html, .htm, .txt files recursively
+    file_patterns = ["*.htm", "*.html"]
+    article_files: List[Path] = []
+    for pattern in file_patterns:
+        logger.debug(f"Looking for {pattern} files in {article_dir}")
+        html_files = list(article_dir.rglob(pattern))
+        logger.info(f"Found {len(html_files)} {pattern} files to process")
+        article_files.extend(html_files)
+    return article_files
+
+
+# (verse_counts, error message or None, stage timings of the file)
+ArticleResult = Tuple[Dict[str, int], Optional[str], StageTimer]
+# ArticleResult plus the cache signature of the bytes that were analyzed (None unless requested)
+AnalyzedArticle = Tuple[Dict[str, int], Optional[str], StageTimer, Optional[FileSignature]]
+# (content or None, FileStat or None, error message or None, stage timer)
+ArticleBytes = Tuple[Optional[bytes], Optional[FileStat], Optional[str], StageTimer]
+
+
+def analyze_article(article_path: str, data: Optional[bytes] = None, digest: bool = False,
+                    file_stat: Optional[FileStat] = None) -> AnalyzedArticle:
+    """
+    Extract and count the verses of a single article
+    Runs in worker processes, so it only depends on its arguments and Config
+    With digest, the content hash for the cache is taken from the same bytes,
+    so the file is not read a second time; file_stat is the stat taken when
+    data was read (by the prefetch pipeline)
+    Returns: (verse_counts, error message or None, stage timer, signature or None)
+    """
+    timer = StageTimer()
+    try:
+        if digest and data is None:
+            # 讀取失敗時 data 仍為 None，交由 extract_verses 照原本方式處理
+            data, file_stat, _, read_timer = read_article_bytes(article_path)
+            timer.merge(read_timer)
+        extractor = VerseExtractor(article_path, timer)
+        verses = extractor.extract_verses(data)
+        with timer.stage('count'):
+            verse_counts = VerseCounter().count_verses(verses)
+        signature = None
+        if digest and data is not None and file_stat is not None:
+            signature = (*file_stat, hashlib.sha256(data).hexdigest())
+        return verse_counts, None, timer, signature
+    except Exception as e:
+        return {}, str(e), timer, None
+
+
+def read_article_bytes(article_path: str) -> ArticleBytes:
+    """
+    Read one article (on a prefetch reader thread, or for the cache digest)
+    The file is stat'ed through the open handle before it is read, so a
+    rewrite during or after the read leaves a stat that no longer matches
+    """
+    timer = StageTimer()
+    try:
+        with timer.stage('read'):
+            with open(article_path, 'rb') as file:
+                st = os.fstat(file.fileno())
+                data = file.read()
+        timer.count('bytes', len(data))
+        return data, (st.st_mtime_ns, st.st_size), None, timer
+    except OSError as e:
+        return None, None, str(e), timer
+
+
+def iter_prefetched(paths: List[str], read_threads: int, depth: int) -> Iterator[ArticleBytes]:
+    """
+    Read files on a thread pool, at most depth files ahead of the consumer
+    Results are yielded in the order of paths; once depth reads are queued no
+    more are started until the consumer takes one, which bounds memory
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, read_threads)) as pool:
+        pending = deque()
+        for path in paths:
+            pending.append(pool.submit(read_article_bytes, path))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def person_row_templates(verse: str, person_matcher: "PersonVerseMatcher") -> Tuple[Dict, ...]:
+    """
+    Output rows of a verse without the per-file Count and File values
+    """
+    verse = sys.intern(verse)
+    # 取得 book 名稱（以空格分割，取第一個）
+    book = verse.split(' ', 1)[0] if ' ' in verse else verse
+    return tuple({
+        'Verse': verse,
+        'Book': book,  # 新增欄位
+        'Count': 0,
+        'PersonID': person['PersonID'],
+        'PersonName': person['Name'],
+        'ZhName': person['ZhName'],
+        'File': ''
+    } for person in person_matcher.find_matching_persons(verse))
+
+
+def build_result_rows(html_file: str, verse_counts: Dict[str, int], person_matcher: "PersonVerseMatcher",
+                      row_cache: Optional[LRUCache] = None) -> List[Dict]:
+    """
+    Expand the verse counts of one file into one output row per matching person
+    With row_cache, the person rows of a verse are looked up once and reused
+    for every file that cites it
+    """
+    rows = []
+    # Find matching persons for each verse
+    for verse, count in verse_counts.items():
+        templates = row_cache.get(verse) if row_cache is not None else None
+        if templates is None:
+            templates = person_row_templates(verse, person_matcher)
+            if row_cache is not None:
+                row_cache.put(verse, templates)
+        for template in templates:
+            rows.append(dict(template, Count=count, File=html_file))
+    return rows
+
+
+@dataclass
+class DocumentAnalysis:
+    """
+    Result of analyzing one in-memory document
+    rows are the matching persons, in the same shape as the OUTPUT_FILE rows
+    """
+    name: str
+    verse_counts: Dict[str, int]
+    rows: List[Dict]
+    error: Optional[str] = None
+
+
+class Analyzer:
+    """
+    Reusable in-process analyzer for documents that are already in memory
+    The person index, verse pattern and normalization tables are loaded once
+    in __init__; analyzing a document touches neither disk nor Config paths.
+    Stage timings and counters of every call accumulate in self.timer
+
+        analyzer = Analyzer()
+        result = analyzer.analyze_html(page_bytes, name=url)
+        result.verse_counts, result.rows
+    """
+    def __init__(self, config: Optional[Config] = None, person_matcher=None):
+        self.config = config if config is not None else Config()
+        self.timer = StageTimer()
+        with self.timer.stage('load_persons'):
+            self.person_matcher = (person_matcher if person_matcher is not None
+                                   else open_person_matcher(self.config))
+        self.extractor = VerseExtractor('', self.timer, self.config)
+        self.counter = VerseCounter()
+        self.row_cache = LRUCache(self.config.RESOLVE_CACHE_SIZE)
+
+    def _result(self, name: str, verses: List[str]) -> DocumentAnalysis:
+        with self.timer.stage('count'):
+            verse_counts = self.counter.count_verses(verses)
+        with self.timer.stage('person_match'):
+            rows = build_result_rows(name, verse_counts, self.person_matcher, self.row_cache)
+        self.row_cache.take_counts(self.timer, 'person_rows')
+        self.timer.count('documents')
+        return DocumentAnalysis(name, verse_counts, rows)
+
+    def analyze_text(self, text: str, name: str = '') -> DocumentAnalysis:
+        """
+        Analyze plain text
+        Returns: DocumentAnalysis with the verse counts and matching persons
+        """
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return self._result(name, self.extractor.extract_from_text(text))
+
+    def analyze_html(self, content: Union[bytes, str], name: str = '') -> DocumentAnalysis:
+        """
+        Analyze an HTML page; bytes are decoded like article files (see decode_article)
+        Returns: DocumentAnalysis with the verse counts and matching persons
+        Raises: ArticleDecodeError if bytes cannot be decoded
+        """
+        if isinstance(content, bytes):
+            self.timer.count('bytes', len(content))
+            content = self.extractor.decode(content)
+        else:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        text = self.extractor.html_to_text(content)
+        return self._result(name, self.extractor.extract_from_text(text))
+
+    def analyze_many(self, documents: Iterable, html: bool = True) -> Iterator[DocumentAnalysis]:
+        """
+        Analyze a stream of documents, yielding one result per document in order
+        Each document is its content (bytes or str) or a (name, content) pair;
+        content is treated as HTML unless html=False. A document that fails is
+        yielded with .error set instead of stopping the batch
+        """
+        for index, document in enumerate(documents):
+            name, content = document if isinstance(document, tuple) else (str(index), document)
+            try:
+                if html:
+                    yield self.analyze_html(content, name)
+                elif isinstance(content, bytes):
+                    yield self.analyze_text(self.extractor.decode(content), name)
+                else:
+                    yield self.analyze_text(content, name)
+            except Exception as e:
+                logger.error(f"Error analyzing document {name}: {str(e)}")
+                yield DocumentAnalysis(name, {}, [], str(e))
+
+
+RESULT_COLUMNS = ['Verse', 'Book', 'Count', 'PersonID', 'PersonName', 'ZhName', 'File']
+SUMMARY_KEYS = ['PersonID', 'PersonName', 'File']
+
+
+def summary_file_for(output_file: str) -> str:
+    return output_file.replace('.csv', '_summary.csv')
+
+
+class DataFrameResultWriter:
+    """
+    Collect all result rows in memory and write both CSV files at the end
+    """
+    def __init__(self, output_file: str):
+        self.output_file = output_file
+        self.results: List[Dict] = []
+        self.row_count = 0
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        self.results.extend(rows)
+        self.row_count += len(rows)
+
+    def close(self) -> None:
+        if not self.results:
+            logger.info("No results found to write to CSV")
+            return
+        df = pd.DataFrame(self.results)
+        df.to_csv(self.output_file, index=False)
+        logger.info(f"Results written to {self.output_file}")
+        logger.info(f"Number of rows written: {len(df)}")
+        
+        # 彙總
+        summary = df.groupby(SUMMARY_KEYS, as_index=False)['Count'].sum()
+        summary_file = summary_file_for(self.output_file)
+        summary.to_csv(summary_file, index=False)
+        logger.info(f"Summary written to {summary_file}")
+        logger.info(f"Number of summary rows: {len(summary)}")
+
+
+def csv_value(value) -> object:
+    """
+    Format a cell the way DataFrame.to_csv does for missing values
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return ''
+    return value
+
+
+def aggregate_summary(summary: Dict[Tuple, int], rows: List[Dict]) -> None:
+    """
+    Add rows to a (PersonID, PersonName, File) -> Count aggregate
+    """
+    for row in rows:
+        key = tuple(row[column] for column in SUMMARY_KEYS)
+        # groupby 預設會排除含缺值的鍵
+        if any(csv_value(value) == '' for value in key):
+            continue
+        summary[key] = summary.get(key, 0) + row['Count']
+
+
+def json_value(value) -> object:
+    """
+    Make a result cell JSON-safe: missing values -> None, numpy scalars -> Python scalars
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return None
+    if hasattr(value, 'item'):
+        return value.item()
+    return value
+
+
+class StreamingResultWriter:
+    """
+    Write result rows to the detail CSV as each file finishes
+    Only the (PersonID, PersonName, File) -> Count aggregate for the summary is
+    kept in memory, so peak memory does not grow with the number of rows
+    """
+    def __init__(self, output_file: str):
+        self.output_file = output_file
+        self.row_count = 0
+        self.summary: Dict[Tuple, int] = {}
+        self._file = None
+        self._writer = None
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        if not rows:
+            return
+        if self._writer is None:
+            self._file = open(self.output_file, 'w', encoding='utf-8', newline='')
+            self._writer = csv.writer(self._file, lineterminator=os.linesep)
+            self._writer.writerow(RESULT_COLUMNS)
+        self._writer.writerows([[csv_value(row[column]) for column in RESULT_COLUMNS] for row in rows])
+        self.row_count += len(rows)
+        aggregate_summary(self.summary, rows)
+
+    def close(self) -> None:
+        if self._file is None:
+            logger.info("No results found to write to CSV")
+            return
+        self._file.close()
+        logger.info(f"Results written to {self.output_file}")
+        logger.info(f"Number of rows written: {self.row_count}")
+
+        summary_file = summary_file_for(self.output_file)
+        with open(summary_file, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.writer(file, lineterminator=os.linesep)
+            writer.writerow(SUMMARY_KEYS + ['Count'])
+            for key in sorted(self.summary):
+                writer.writerow([csv_value(value) for value in key] + [self.summary[key]])
+        logger.info(f"Summary written to {summary_file}")
+        logger.info(f"Number of summary rows: {len(self.summary)}")
+
+
+# 輸出格式 -> 副檔名；parquet 與 feather 需要選用套件 pyarrow
+OUTPUT_FORMATS: Dict[str, str] = {
+    'csv': '.csv',
+    'parquet': '.parquet',
+    'feather': '.feather',
+}
+# 重複度高的字串欄位，以字典編碼（categorical）儲存
+DICTIONARY_COLUMNS = ['Verse', 'Book', 'PersonName', 'ZhName', 'File']
+
+
+def output_path_for(output_file: str, output_format: str) -> str:
+    """
+    Swap the .csv suffix of a configured path for the extension of output_format
+    """
+    if output_format == 'csv':
+        return output_file
+    base = output_file[:-len('.csv')] if output_file.endswith('.csv') else output_file
+    return base + OUTPUT_FORMATS[output_format]
+
+
+def import_pyarrow():
+    """
+    Import pyarrow on first use so that CSV runs do not need it
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("OUTPUT_FORMAT 'parquet' and 'feather' require pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def write_frame(df: pd.DataFrame, output_file: str, output_format: str = 'csv') -> str:
+    """
+    Write a (summary) DataFrame in the configured format; string columns are
+    stored dictionary-encoded in the columnar formats
+    Returns: the path written
+    """
+    path = output_path_for(output_file, output_format)
+    if output_format == 'csv':
+        df.to_csv(path, index=False)
+        return path
+    import_pyarrow()
+    df = df.astype({column: 'category' for column in df.columns if df[column].dtype == object})
+    if output_format == 'parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_feather(path)
+    return path
+
+
+class ArrowResultWriter:
+    """
+    Stream result rows to a Parquet or Feather (Arrow IPC) file in row groups
+    Strings are dictionary-encoded against dictionaries that only grow during
+    the run, so each row group stores small int32 indices plus the new
+    dictionary entries; at most ROW_GROUP_SIZE rows are buffered
+    """
+    def __init__(self, output_file: str, output_format: str, row_group_size: int = 100_000):
+        self.pa = import_pyarrow()
+        self.output_format = output_format
+        self._configured_file = output_file
+        self.output_file = output_path_for(output_file, output_format)
+        self.summary_file = output_path_for(summary_file_for(output_file), output_format)
+        self.row_group_size = row_group_size
+        self.row_count = 0
+        self.summary: Dict[Tuple, int] = {}
+        self._buffer: List[Dict] = []
+        self._dictionaries: Dict[str, Dict[str, int]] = {column: {} for column in DICTIONARY_COLUMNS}
+        self._schema = None
+        self._writer = None
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        self._buffer.extend(rows)
+        self.row_count += len(rows)
+        aggregate_summary(self.summary, rows)
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+
+    def _dictionary_column(self, column: str, values: List):
+        pa = self.pa
+        codes = self._dictionaries[column]
+        indices = [None if csv_value(value) == '' else codes.setdefault(str(value), len(codes)) for value in values]
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int32()),
+                                              pa.array(list(codes), type=pa.string()))
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        pa = self.pa
+        rows, self._buffer = self._buffer, []
+        columns = {}
+        for column in RESULT_COLUMNS:
+            values = [row[column] for row in rows]
+            if column in self._dictionaries:
+                columns[column] = self._dictionary_column(column, values)
+            elif self._schema is None:
+                columns[column] = pa.array(values, from_pandas=True)
+            else:
+                columns[column] = pa.array(values, type=self._schema.field(column).type, from_pandas=True)
+        batch = pa.RecordBatch.from_pydict(columns)
+        if self._writer is None:
+            self._schema = batch.schema
+            if self.output_format == 'parquet':
+                self._writer = pa.parquet.ParquetWriter(self.output_file, self._schema)
+            else:
+                # 字典只會增長，因此可用 delta 寫入 IPC 檔案
+                options = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+                self._writer = pa.ipc.new_file(self.output_file, self._schema, options=options)
+        if self.output_format == 'parquet':
+            self._writer.write_batch(batch, row_group_size=len(rows))
+        else:
+            self._writer.write_batch(batch)
+
+    def close(self) -> None:
+        self._flush()
+        if self._writer is None:
+            logger.info("No results found to write")
+            return
+        self._writer.close()
+        logger.info(f"Results written to {self.output_file}")
+        logger.info(f"Number of rows written: {self.row_count}")
+
+        keys = sorted(self.summary)
+        summary = pd.DataFrame(keys, columns=SUMMARY_KEYS)
+        summary['Count'] = [self.summary[key] for key in keys]
+        write_frame(summary, summary_file_for(self._configured_file), self.output_format)
+        logger.info(f"Summary written to {self.summary_file}")
+        logger.info(f"Number of summary rows: {len(summary)}")
+
+
+# 彙總報表名稱 -> 輸出檔名後綴（接在 OUTPUT_FILE 之後）
+SUMMARY_VIEWS: Dict[str, str] = {
+    'person': '_by_person',
+    'book': '_by_book',
+    'file': '_by_file',
+    'top_verses': '_top_verses',
+    'cooccurrence': '_cooccurrence',
+}
+
+
+def summary_view_file(output_file: str, view: str) -> str:
+    return output_file.replace('.csv', f"{SUMMARY_VIEWS[view]}.csv")
+
+
+class AnalyticsStore:
+    """
+    Columnar copy of the run's results for corpus-wide summaries
+    Files, verses and persons are stored once in code tables; per file only
+    integer arrays are kept: (file_id, verse_code, count) for every verse
+    found and (file_id, verse_code, person_code, count) for every match
+    """
+    def __init__(self):
+        self.files: List[str] = []
+        self.verse_codes: Dict[str, int] = {}
+        self.person_codes: Dict[Tuple, int] = {}
+        self._verse_chunks: List[Tuple[np.ndarray, ...]] = []
+        self._match_chunks: List[Tuple[np.ndarray, ...]] = []
+
+    def add_file(self, html_file: str, verse_counts: Dict[str, int], rows: List[Dict]) -> None:
+        file_id = len(self.files)
+        self.files.append(html_file)
+        if verse_counts:
+            codes = [self.verse_codes.setdefault(verse, len(self.verse_codes)) for verse in verse_counts]
+            self._verse_chunks.append((
+                np.full(len(codes), file_id, dtype=np.int32),
+                np.array(codes, dtype=np.int32),
+                np.fromiter(verse_counts.values(), dtype=np.int64, count=len(codes)),
+            ))
+        # 與 _summary.csv 相同，排除 PersonID 等鍵值缺漏的列
+        rows = [row for row in rows if all(csv_value(row[key]) != '' for key in SUMMARY_KEYS)]
+        if rows:
+            self._match_chunks.append((
+                np.full(len(rows), file_id, dtype=np.int32),
+                np.array([self.verse_codes[row['Verse']] for row in rows], dtype=np.int32),
+                np.array([self.person_codes.setdefault((row['PersonID'], row['PersonName'], row['ZhName']),
+                                                       len(self.person_codes)) for row in rows], dtype=np.int32),
+                np.array([row['Count'] for row in rows], dtype=np.int64),
+            ))
+
+    @staticmethod
+    def _frame(chunks: List[Tuple[np.ndarray, ...]], columns: List[str]) -> pd.DataFrame:
+        if not chunks:
+            return pd.DataFrame({column: np.array([], dtype=np.int64) for column in columns})
+        return pd.DataFrame({column: np.concatenate([chunk[i] for chunk in chunks])
+                             for i, column in enumerate(columns)})
+
+    def verse_frame(self) -> pd.DataFrame:
+        return self._frame(self._verse_chunks, ['file', 'verse', 'count'])
+
+    def match_frame(self) -> pd.DataFrame:
+        return self._frame(self._match_chunks, ['file', 'verse', 'person', 'count'])
+
+    def person_table(self) -> pd.DataFrame:
+        return pd.DataFrame(list(self.person_codes), columns=['PersonID', 'PersonName', 'ZhName'])
+
+    def summaries(self, views: List[str], top_verses: int = 100) -> Dict[str, pd.DataFrame]:
+        """
+        Compute the requested views with vectorized groupbys over the code arrays
+        Returns: view name -> DataFrame
+        """
+        verses = self.verse_frame()
+        matches = self.match_frame()
+        verse_names = np.array(list(self.verse_codes), dtype=object)
+        persons = self.person_table()
+        results = {}
+
+        if 'person' in views:
+            grouped = matches.groupby('person').agg(
+                Count=('count', 'sum'), Files=('file', 'nunique'), Verses=('verse', 'nunique'))
+            summary = persons.iloc[grouped.index].reset_index(drop=True)
+            summary[['Count', 'Files', 'Verses']] = grouped.to_numpy()
+            results['person'] = summary.sort_values(['Count', 'PersonID'], ascending=[False, True],
+                                                    kind='stable', ignore_index=True)
+
+        if 'book' in views:
+            books = np.array([verse.split(' ', 1)[0] for verse in verse_names], dtype=object)
+            frame = verses.assign(Book=books[verses['verse'].to_numpy()])
+            summary = frame.groupby('Book', as_index=False).agg(
+                Count=('count', 'sum'), Verses=('verse', 'nunique'), Files=('file', 'nunique'))
+            # 依正典順序排列，無法辨識的書卷排在最後
+            order = summary['Book'].map(lambda book: BOOK_ORDINALS.get(book, len(BOOK_ORDINALS)))
+            results['book'] = summary.iloc[np.lexsort((summary['Book'], order))].reset_index(drop=True)
+
+        if 'file' in views:
+            grouped = verses.groupby('file').agg(Verses=('verse', 'size'), Count=('count', 'sum'))
+            persons_per_file = matches.groupby('file')['person'].nunique()
+            summary = pd.DataFrame({'File': self.files})
+            summary['Verses'] = grouped['Verses'].reindex(summary.index, fill_value=0).to_numpy()
+            summary['Count'] = grouped['Count'].reindex(summary.index, fill_value=0).to_numpy()
+            summary['Persons'] = persons_per_file.reindex(summary.index, fill_value=0).to_numpy()
+            results['file'] = summary
+
+        if 'top_verses' in views:
+            grouped = verses.groupby('verse').agg(Count=('count', 'sum'), Files=('file', 'nunique'))
+            summary = pd.DataFrame({'Verse': verse_names[grouped.index.to_numpy()],
+                                    'Count': grouped['Count'].to_numpy(), 'Files': grouped['Files'].to_numpy()})
+            summary = summary.sort_values(['Count', 'Verse'], ascending=[False, True], kind='stable')
+            results['top_verses'] = summary.head(top_verses).reset_index(drop=True)
+
+        if 'cooccurrence' in views:
+            # 同一檔案中出現的人物兩兩配對，計算共同出現的檔案數
+            present = matches[['file', 'person']].drop_duplicates()
+            # 以 PersonID 排序後的名次配對，使 A 永遠是 PersonID 較小的一方
+            rank = np.empty(len(persons), dtype=np.int64)
+            rank[persons.sort_values('PersonID', kind='stable').index.to_numpy()] = np.arange(len(persons))
+            present = present.assign(rank=rank[present['person'].to_numpy()])
+            pairs = present.merge(present, on='file', suffixes=('_a', '_b'))
+            pairs = pairs[pairs['rank_a'] < pairs['rank_b']]
+            grouped = pairs.groupby(['person_a', 'person_b']).size()
+            a = persons.iloc[grouped.index.get_level_values(0)].reset_index(drop=True)
+            b = persons.iloc[grouped.index.get_level_values(1)].reset_index(drop=True)
+            summary = pd.DataFrame({
+                'PersonID_A': a['PersonID'], 'PersonName_A': a['PersonName'],
+                'PersonID_B': b['PersonID'], 'PersonName_B': b['PersonName'],
+                'Files': grouped.to_numpy(),
+            })
+            results['cooccurrence'] = summary.sort_values(
+                ['Files', 'PersonID_A', 'PersonID_B'], ascending=[False, True, True], kind='stable', ignore_index=True)
+        return results
+
+    def write_summaries(self, output_file: str, views: List[str], top_verses: int = 100,
+                        output_format: str = 'csv') -> None:
+        for view, summary in self.summaries(views, top_verses).items():
+            path = write_frame(summary, summary_view_file(output_file, view), output_format)
+            logger.info(f"{view} summary written to {path} ({len(summary)} rows)")
+
+
+def iter_article_results(article_files: List[Path], config: Config,
+                         digest: bool = False) -> Iterator[AnalyzedArticle]:
+    """
+    Analyze articles serially or on a process pool
+    With PREFETCH_DEPTH > 0, reader threads fetch file bytes ahead of the
+    parsers so that slow reads overlap with parsing
+    Results are yielded in the order of article_files regardless of the worker
+    count, so the merged output does not depend on scheduling
+    With digest, each result also carries the SHA-256 of the file content
+    """
+    paths = [str(html_file) for html_file in article_files]
+    workers = config.WORKERS
+    if config.PREFETCH_DEPTH > 0:
+        yield from iter_pipelined_results(paths, config, digest)
+        return
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield analyze_article(path, digest=digest)
+        return
+    chunksize = max(1, min(64, len(paths) // (workers * 4)))
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(analyze_article, paths, repeat(None), repeat(digest), chunksize=chunksize)
+
+
+def iter_pipelined_results(paths: List[str], config: Config,
+                           digest: bool = False) -> Iterator[AnalyzedArticle]:
+    """
+    Producer/consumer pipeline: reader threads -> bounded queue -> parsers
+    Parsers run in this process (WORKERS = 1) or on a process pool, again with
+    at most max(PREFETCH_DEPTH, WORKERS) files in flight, so a shallow queue
+    never leaves workers idle
+    Time spent waiting for the readers is recorded as the prefetch_wait stage
+    """
+    depth = max(config.PREFETCH_DEPTH, config.WORKERS)
+    reads = iter_prefetched(paths, config.READ_THREADS, depth)
+    from concurrent.futures import ProcessPoolExecutor
+    executor = ProcessPoolExecutor(max_workers=config.WORKERS) if config.WORKERS > 1 else None
+    pending = deque()
+    try:
+        for path in paths:
+            wait_start = time.perf_counter()
+            data, file_stat, error, read_timer = next(reads)
+            read_timer.seconds['prefetch_wait'] = time.perf_counter() - wait_start
+            if error is not None:
+                pending.append(({}, error, read_timer, None))
+            elif executor is None:
+                verse_counts, error, timer, signature = analyze_article(path, data, digest, file_stat)
+                timer.merge(read_timer)
+                pending.append((verse_counts, error, timer, signature))
+            else:
+                pending.append((executor.submit(analyze_article, path, data, digest, file_stat), read_timer))
+            while pending and (executor is None or len(pending) >= depth):
+                yield resolve_pending(pending.popleft())
+        while pending:
+            yield resolve_pending(pending.popleft())
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def resolve_pending(item) -> AnalyzedArticle:
+    if len(item) == 4:
+        return item
+    future, read_timer = item
+    try:
+        verse_counts, error, timer, signature = future.result()
+    except Exception as e:
+        verse_counts, error, timer, signature = {}, str(e), StageTimer(), None
+    timer.merge(read_timer)
+    return verse_counts, error, timer, signature
+
+
+def iter_cached_results(article_files: List[Path], config: Config,
+                        cache: Optional[VerseCache]) -> Iterator[ArticleResult]:
+    """
+    Like iter_article_results, but serve unchanged files from the cache
+    Only cache misses are analyzed; the workers stat and hash the bytes they
+    read and the counts are stored back under that signature
+    """
+    if cache is None:
+        for verse_counts, error, timer, _ in iter_article_results(article_files, config):
+            yield verse_counts, error, timer
+        return
+    lookups = []
+    for html_file in article_files:
+        timer = StageTimer()
+        with timer.stage('cache_lookup'):
+            try:
+                counts = cache.lookup(str(html_file))
+            except OSError:
+                cache.misses += 1
+                counts = None
+        lookups.append((counts, timer))
+    misses = [html_file for html_file, (counts, _) in zip(article_files, lookups) if counts is None]
+    fresh = iter_article_results(misses, config, digest=True)
+    for html_file, (counts, timer) in zip(article_files, lookups):
+        if counts is not None:
+            timer.count('cache_hits')
+            yield counts, None, timer
+            continue
+        counts, error, file_timer, signature = next(fresh)
+        timer.merge(file_timer)
+        if error is None and signature is not None:
+            with timer.stage('cache_store'):
+                cache.store(str(html_file), signature, counts)
+        yield counts, error, timer
+
+
+def replay_checkpoint(records: List[Dict], counter: str = 'resumed') -> Iterator[ArticleResult]:
+    """
+    Turn checkpoint (or shard) records back into per-file analysis results
+    """
+    for record in records:
+        timer = StageTimer()
+        timer.count(counter)
+        if record['undecodable']:
+            timer.count('undecodable')
+        yield record['verse_counts'], record['error'], timer
+
+
+def shard_of(relative_path: str, count: int) -> int:
+    """
+    Shard of an article: CRC-32 of its path relative to ARTICLE_DIR (with /
+    separators) modulo count, so every node assigns files the same way
+    """
+    return zlib.crc32(relative_path.encode('utf-8')) % count
+
+
+def shard_output_file(output_file: str, index: int, count: int) -> str:
+    """
+    OUTPUT_FILE of one shard; its partial result, cache and checkpoint are named after it
+    """
+    return output_file.replace('.csv', f'_shard{index}of{count}.csv')
+
+
+def partial_file_for(output_file: str) -> str:
+    return output_file.replace('.csv', '_partial.json.gz')
+
+
+class ShardResultWriter:
+    """
+    Partial result of a sharded scan, combined by the merge command
+    Instead of output rows it keeps the verse counts of every file (with the
+    file's index in the full list_article_files order) and the persons of
+    every verse cited in the shard, which is all merge needs to rebuild the
+    rows; tPerson.csv is not needed for merging. Written as gzipped JSON to
+    a temporary file and moved into place when the shard is complete
+    """
+    VERSION = 1
+
+    def __init__(self, partial_file: str, index: int, count: int, total_files: int, fingerprint: str):
+        self.partial_file = partial_file
+        self.header = {'version': self.VERSION, 'fingerprint': fingerprint,
+                       'shard': index, 'shards': count, 'total_files': total_files}
+        self.files: List[Dict] = []
+        # 人物表與經文 -> 人物表位置（保持 find_matching_persons 的順序）
+        self.persons: List[List] = []
+        self.verse_persons: Dict[str, List[int]] = {}
+        self._person_index: Dict[str, int] = {}
+        self.row_count = 0
+
+    def add_file(self, file_index: int, html_file: str, verse_counts: Dict[str, int],
+                 error: Optional[str], undecodable: bool) -> None:
+        self.files.append({'index': file_index, 'file': html_file, 'verse_counts': verse_counts,
+                           'error': error, 'undecodable': undecodable})
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        self.row_count += len(rows)
+        new_verses: Dict[str, List[int]] = {}
+        for row in rows:
+            verse = row['Verse']
+            if verse in self.verse_persons:
+                continue
+            person = tuple(value.item() if hasattr(value, 'item') else value
+                           for value in (row['PersonID'], row['PersonName'], row['ZhName']))
+            # 以 JSON 字串為鍵，讓缺值（NaN）的人物也能去重
+            key = json.dumps(person)
+            position = self._person_index.get(key)
+            if position is None:
+                position = self._person_index[key] = len(self.persons)
+                self.persons.append(list(person))
+            new_verses.setdefault(verse, []).append(position)
+        self.verse_persons.update(new_verses)
+
+    def close(self) -> None:
+        partial = dict(self.header, files=self.files, persons=self.persons, verse_persons=self.verse_persons)
+        tmp_file = f"{self.partial_file}.tmp{os.getpid()}"
+        with gzip.open(tmp_file, 'wt', encoding='utf-8') as file:
+            json.dump(partial, file, ensure_ascii=False)
+        os.replace(tmp_file, self.partial_file)
+        logger.info(f"Shard {self.header['shard']}/{self.header['shards']}: {len(self.files)} of "
+                    f"{self.header['total_files']} files written to {self.partial_file}")
+
+
+class ShardPersonMatcher:
+    """
+    Verse -> person lookup rebuilt from the person tables of shard results
+    """
+    def __init__(self):
+        self.persons: List[Dict] = []
+        self.person_verses: Dict[str, List[int]] = {}
+        self._person_index: Dict[str, int] = {}
+        # 不同分片對同一經文給出不同人物（tPerson.csv 不一致）的經文數
+        self.conflicts = 0
+
+    def add(self, persons: List[List], verse_persons: Dict[str, List[int]]) -> None:
+        positions = []
+        for person in persons:
+            key = json.dumps(person)
+            if key not in self._person_index:
+                self._person_index[key] = len(self.persons)
+                self.persons.append({'PersonID': person[0], 'Name': person[1], 'ZhName': person[2]})
+            positions.append(self._person_index[key])
+        for verse, local in verse_persons.items():
+            merged = [positions[i] for i in local]
+            known = self.person_verses.setdefault(verse, merged)
+            if known != merged:
+                self.conflicts += 1
+
+    def find_matching_persons(self, verse: str) -> List[Dict]:
+        return [self.persons[i] for i in self.person_verses.get(verse, [])]
+
+
+def load_partial_results(partial_files: List[str]) -> Tuple[List[Dict], ShardPersonMatcher]:
+    """
+    Read and check a set of shard results
+    Returns: the file records of all shards in full-scan order, and their persons
+    Raises: ValueError if the shards come from different scans or overlap
+    """
+    records: List[Dict] = []
+    matcher = ShardPersonMatcher()
+    header = None
+    seen_shards = set()
+    for partial_file in partial_files:
+        with gzip.open(partial_file, 'rt', encoding='utf-8') as file:
+            partial = json.load(file)
+        if partial.get('version') != ShardResultWriter.VERSION:
+            raise ValueError(f"{partial_file} is not a shard result of this version")
+        current = {key: partial[key] for key in ('fingerprint', 'shards', 'total_files')}
+        if header is None:
+            header = current
+        elif current != header:
+            raise ValueError(f"{partial_file} comes from a different scan ({current} != {header})")
+        if partial['shard'] in seen_shards:
+            raise ValueError(f"Shard {partial['shard']}/{partial['shards']} given twice ({partial_file})")
+        seen_shards.add(partial['shard'])
+        records.extend(partial['files'])
+        matcher.add(partial['persons'], partial['verse_persons'])
+    if header is None:
+        raise ValueError("No shard results given")
+    if header['fingerprint'] != analysis_fingerprint(Config.LANGUAGE):
+        logger.warning("Shard results were made with other analysis settings than the current ones")
+    missing = sorted(set(range(header['shards'])) - seen_shards)
+    if missing:
+        logger.warning(f"Missing shards {', '.join(map(str, missing))} of {header['shards']}; "
+                       f"the merged output covers {len(records)} of {header['total_files']} files")
+    if matcher.conflicts:
+        logger.warning(f"{matcher.conflicts} verses have different persons in different shards "
+                       f"(were the shards run with the same tPerson.csv?)")
+    records.sort(key=lambda record: record['index'])
+    return records, matcher
+
+
+# 執行報告中各階段的顯示順序
+PIPELINE_STAGES = ['load_persons', 'cache_lookup', 'read', 'prefetch_wait', 'decode', 'html_to_text', 'regex_scan', 'normalize',
+                   'count', 'cache_store', 'checkpoint', 'person_match', 'csv_output', 'analytics']
+
+
+# 解析階段（CPU），用於計算 CPU 端吞吐量
+CPU_STAGES = ['decode', 'html_to_text', 'regex_scan', 'normalize', 'count']
+
+
+def stage_throughput(timer: StageTimer) -> Dict[str, float]:
+    """
+    MB/s of the I/O stage (reading) and of the CPU stages (parsing), each
+    relative to the time spent in that stage
+    """
+    megabytes = timer.counters.get('bytes', 0) / 1e6
+    read_seconds = timer.seconds.get('read', 0.0)
+    cpu_seconds = sum(timer.seconds.get(name, 0.0) for name in CPU_STAGES)
+    throughput = {}
+    if megabytes and read_seconds:
+        throughput['I/O'] = megabytes / read_seconds
+    if megabytes and cpu_seconds:
+        throughput['CPU'] = megabytes / cpu_seconds
+    return throughput
+
+
+# 各 LRU 快取在 StageTimer 中的計數器前綴
+RESOLVE_CACHES = ['resolve', 'person_rows']
+
+
+def cache_hit_rates(timer: StageTimer) -> Dict[str, float]:
+    """
+    Hit rate of each resolve cache that was used in the run
+    """
+    rates = {}
+    for prefix in RESOLVE_CACHES:
+        lookups = timer.counters.get(f"{prefix}_hits", 0) + timer.counters.get(f"{prefix}_misses", 0)
+        if lookups:
+            rates[prefix] = timer.counters.get(f"{prefix}_hits", 0) / lookups
+    return rates
+
+
+def log_stage_summary(timer: StageTimer, wall_seconds: float) -> None:
+    """
+    Log per-stage timings; per-file stages are summed over all workers
+    """
+    logger.info(f"Run finished in {wall_seconds:.2f}s")
+    for name in PIPELINE_STAGES + sorted(set(timer.seconds) - set(PIPELINE_STAGES)):
+        if name in timer.seconds:
+            logger.info(f"  {name:<14} {timer.seconds[name]:10.3f}s")
+    for name, value in sorted(timer.counters.items()):
+        logger.info(f"  {name:<14} {value:>10}")
+    for name, rate in stage_throughput(timer).items():
+        logger.info(f"  {name + ' stage':<14} {rate:10.2f} MB/s")
+    for prefix, rate in cache_hit_rates(timer).items():
+        logger.info(f"  {prefix + ' cache':<14} {rate:10.1%} hit rate, "
+                    f"{timer.counters.get(prefix + '_evictions', 0)} evictions")
+
+
+def write_run_report(report_file: str, config: Config, timer: StageTimer,
+                     file_records: List[Dict], wall_seconds: float,
+                     undecodable_files: Optional[List[str]] = None) -> None:
+    """
+    Write the machine-readable JSON run report
+    """
+    report = {
+        'config': asdict(config),
+        'wall_seconds': wall_seconds,
+        'stages': {name: timer.seconds[name] for name in PIPELINE_STAGES if name in timer.seconds},
+        'counters': timer.counters,
+        'throughput_mb_s': stage_throughput(timer),
+        'cache_hit_rates': cache_hit_rates(timer),
+        'files': file_records,
+        'undecodable_files': undecodable_files or [],
+    }
+    with open(report_file, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    logger.info(f"Run report written to {report_file}")
+
+
+def parse_summary_views(value: str) -> List[str]:
+    views = list(SUMMARY_VIEWS) if value == 'all' else [view.strip() for view in value.split(',') if view.strip()]
+    unknown = [view for view in views if view not in SUMMARY_VIEWS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown summaries: {', '.join(unknown)}")
+    return views
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    try:
+        shard, shards = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if shards < 1 or not 0 <= shard < shards:
+        raise argparse.ArgumentTypeError(f"shard must satisfy 0 <= i < N, got {value!r}")
+    return shard, shards
+
+
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--stream", action="store_true", default=Config.STREAM_OUTPUT,
+                        help="write result rows to the CSV as each file finishes instead of at the end")
+    parser.add_argument("--format", dest="output_format", default=Config.OUTPUT_FORMAT, choices=list(OUTPUT_FORMATS),
+                        help="output file format; parquet and feather need pyarrow (default: %(default)s)")
+    parser.add_argument("--summaries", type=parse_summary_views, default=list(Config.SUMMARIES), metavar="VIEWS",
+                        help="comma-separated extra summaries (%s) or 'all'" % ', '.join(SUMMARY_VIEWS))
+    parser.add_argument("--report", default=Config.REPORT_FILE, metavar="FILE",
+                        help="write a JSON run report with stage timings and per-file counts")
+
+
+def add_scan_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--workers", type=int, default=Config.WORKERS,
+                        help="number of worker processes (default: %(default)s, 0 = one per CPU)")
+    parser.add_argument("--prefetch", type=int, default=Config.PREFETCH_DEPTH, metavar="DEPTH",
+                        help="read up to DEPTH files ahead on reader threads; with --workers the window is "
+                             "at least the worker count (default: %(default)s = off)")
+    parser.add_argument("--read-threads", type=int, default=Config.READ_THREADS,
+                        help="reader threads used with --prefetch (default: %(default)s)")
+    parser.add_argument("--build-index", action="store_true",
+                        help="compile TPERSON_FILE into PERSON_INDEX_FILE and exit")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false", default=Config.USE_CACHE,
+                        help="re-analyze every file instead of reusing cached verse counts")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted run from its checkpoint instead of starting over")
+    parser.add_argument("--checkpoint-every", type=int, default=Config.CHECKPOINT_EVERY, metavar="N",
+                        help="checkpoint after every N completed files (default: %(default)s, 0 = off)")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="analyze only shard I of N (0-based, by a hash of each file's path under ARTICLE_DIR) "
+                             "and write a partial result for `merge`")
+    add_output_arguments(parser)
+
+
+# 子命令；不帶子命令時執行 scan，與舊版 `python bible_verse_analyzer.py [旗標]` 相同
+COMMANDS = ['scan', 'file', 'index', 'stats', 'merge']
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv = ['scan'] + argv
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--log-level", default=Config.LOG_LEVEL, choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="console log level; DEBUG prints the verses found in every file")
+    common.add_argument("--profile", default="", metavar="FILE",
+                        help="run under cProfile and dump pstats data to FILE")
+    common.add_argument("--article-dir", default=Config.ARTICLE_DIR, help="default: %(default)s")
+    common.add_argument("--tperson", default=Config.TPERSON_FILE, help="default: %(default)s")
+    common.add_argument("--person-index", default=Config.PERSON_INDEX_FILE, help="default: %(default)s")
+    common.add_argument("--output", default=Config.OUTPUT_FILE, help="default: %(default)s")
+
+    parser = argparse.ArgumentParser(description="Extract Bible verses from articles and match them with tPerson.csv")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    scan = commands.add_parser("scan", parents=[common], help="analyze every article in ARTICLE_DIR (default)")
+    add_scan_arguments(scan)
+    single = commands.add_parser("file", parents=[common], help="analyze one article and print its verses and persons")
+    single.add_argument("path", help=".htm/.html article (any other suffix is read as plain text)")
+    single.add_argument("--json", action="store_true", help="print the result as JSON")
+    # common 只掛在最末層的 build；若 index 也掛，build 的預設值會蓋掉寫在 index 後面的選項
+    index = commands.add_parser("index", help="manage the prebuilt person index")
+    index_commands = index.add_subparsers(dest="index_command", metavar="ACTION", required=True)
+    index_commands.add_parser("build", parents=[common], help="compile TPERSON_FILE into PERSON_INDEX_FILE")
+    stats = commands.add_parser("stats", parents=[common], help="show statistics of PERSON_INDEX_FILE")
+    stats.add_argument("--json", action="store_true", help="print the statistics as JSON")
+    merge = commands.add_parser("merge", parents=[common],
+                                help="combine the partial results of `scan --shard` runs into OUTPUT_FILE")
+    merge.add_argument("partials", nargs="+", metavar="PARTIAL", help="*_partial.json.gz files written by the shards")
+    add_output_arguments(merge)
+    args = parser.parse_args(argv)
+    if args.command == 'scan' and args.resume and args.checkpoint_every <= 0:
+        # 停用檢查點時沒有可接續的進度，不可默默從頭開始
+        scan.error("--resume needs checkpoints; it cannot be combined with --checkpoint-every 0")
+    return args
+
+
+def setup_console_logging(level: str) -> None:
+    """
+    Send progress messages to stdout; the log file keeps receiving errors only
+    """
+    logger.setLevel(level)
+    logger.propagate = False
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+
+
+def config_from_args(args: argparse.Namespace) -> Config:
+    """
+    Config with the path options of the command line applied
+    """
+    return Config(ARTICLE_DIR=args.article_dir, TPERSON_FILE=args.tperson,
+                  PERSON_INDEX_FILE=args.person_index, OUTPUT_FILE=args.output)
+
+
+def write_results(args: argparse.Namespace, config: Config, person_matcher, article_files: List[Path],
+                  results: Iterator[ArticleResult], run_timer: StageTimer, started: float, *,
+                  checkpoint: Optional[RunCheckpoint] = None, resumed: int = 0, cache: Optional[VerseCache] = None,
+                  shard_writer: Optional[ShardResultWriter] = None, file_indexes: Optional[List[int]] = None) -> None:
+    """
+    Turn per-file results into the outputs, the report and the run summary
+    Shared by scan (fresh, cached or resumed results) and merge (replayed
+    shard results), so both produce the same files. With shard_writer the
+    verse counts and person rows go to the shard's partial result instead
+    """
+    error_logger = ErrorLogger()
+    file_records: List[Dict] = []
+    undecodable_files: List[str] = []
+    
+    if shard_writer is not None:
+        writer = shard_writer
+    else:
+        try:
+            if config.OUTPUT_FORMAT != 'csv':
+                writer = ArrowResultWriter(config.OUTPUT_FILE, config.OUTPUT_FORMAT, config.ROW_GROUP_SIZE)
+            elif config.STREAM_OUTPUT:
+                writer = StreamingResultWriter(config.OUTPUT_FILE)
+            else:
+                writer = DataFrameResultWriter(config.OUTPUT_FILE)
+        except ImportError as e:
+            error_logger.log_error("output_error", str(e))
+            logger.error(f"Error: {str(e)}")
+            if cache is not None:
+                cache.close()
+            return
+    
+    store = AnalyticsStore() if config.SUMMARIES and shard_writer is None else None
+    row_cache = LRUCache(config.RESOLVE_CACHE_SIZE)
+    
+    try:
+        for index, (html_file, (verse_counts, error, file_timer)) in enumerate(zip(article_files, results)):
+            run_timer.merge(file_timer)
+            run_timer.count('files')
+            if checkpoint is not None and index >= resumed:
+                with run_timer.stage('checkpoint'):
+                    checkpoint.record(str(html_file), verse_counts, error, 'undecodable' in file_timer.counters)
+            if shard_writer is not None:
+                shard_writer.add_file(file_indexes[index], str(html_file), verse_counts, error,
+                                      'undecodable' in file_timer.counters)
+            if args.report:
+                file_records.append({
+                    'file': str(html_file),
+                    'bytes': file_timer.counters.get('bytes', 0),
+                    'matches': file_timer.counters.get('matches', 0),
+                    'verses': file_timer.counters.get('verses', 0),
+                    'cached': 'cache_hits' in file_timer.counters,
+                    'charset': next((name[len('charset_'):] for name in file_timer.counters
+                                     if name.startswith('charset_')), None),
+                    'seconds': sum(file_timer.seconds.values()),
+                })
+            if 'undecodable' in file_timer.counters:
+                undecodable_files.append(str(html_file))
+            if error is not None:
+                error_logger.log_error("processing_error", f"Error processing file {html_file}: {error}")
+                logger.error(f"Error processing file {html_file}: {error}")
+                continue
+            try:
+                with run_timer.stage('person_match'):
+                    rows = build_result_rows(str(html_file), verse_counts, person_matcher, row_cache)
+                with run_timer.stage('csv_output'):
+                    writer.write_rows(rows)
+                if store is not None:
+                    with run_timer.stage('analytics'):
+                        store.add_file(str(html_file), verse_counts, rows)
+                logger.debug("Finished processing file: %s, verse_counts: %s", html_file, verse_counts)
+            except Exception as e:
+                error_logger.log_error("processing_error", f"Error processing file {html_file}: {str(e)}")
+                logger.error(f"Error processing file {html_file}: {str(e)}")
+                continue
+    finally:
+        if checkpoint is not None:
+            with run_timer.stage('checkpoint'):
+                checkpoint.flush()
+    
+    if cache is not None:
+        cache.close()
+        logger.info(f"Cache: {cache.hits} hits, {cache.misses} misses ({cache.cache_file})")
+    logger.info(f"Total results found: {writer.row_count}")
+    
+    # Write results to CSV
+    outputs_written = True
+    try:
+        with run_timer.stage('csv_output'):
+            writer.close()
+    except Exception as e:
+        outputs_written = False
+        error_logger.log_error("output_error", f"Error writing results: {str(e)}")
+        logger.error(f"Error writing results: {str(e)}")
+    
+    if store is not None:
+        try:
+            with run_timer.stage('analytics'):
+                store.write_summaries(config.OUTPUT_FILE, list(config.SUMMARIES), config.TOP_VERSES,
+                                      config.OUTPUT_FORMAT)
+        except Exception as e:
+            outputs_written = False
+            error_logger.log_error("output_error", f"Error writing summaries: {str(e)}")
+            logger.error(f"Error writing summaries: {str(e)}")
+    
+    if checkpoint is not None and outputs_written:
+        # 輸出已完整寫出，檢查點不再需要
+        checkpoint.remove()
+    
+    run_timer.count('rows', writer.row_count)
+    row_cache.take_counts(run_timer, 'person_rows')
+    wall_seconds = time.perf_counter() - started
+    log_stage_summary(run_timer, wall_seconds)
+    if undecodable_files:
+        logger.warning(f"Undecodable files ({len(undecodable_files)}):")
+        for path in undecodable_files:
+            logger.warning(f"  {path}")
+    if args.report:
+        write_run_report(args.report, config, run_timer, file_records, wall_seconds, undecodable_files)
+
+
+def run_analysis(args: argparse.Namespace) -> None:
     # Initialize components
-    config = Config()
+    config = config_from_args(args)
+    config.WORKERS = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    config.USE_CACHE = args.use_cache
+    config.PREFETCH_DEPTH = args.prefetch
+    config.READ_THREADS = args.read_threads
+    config.STREAM_OUTPUT = args.stream
+    config.SUMMARIES = tuple(args.summaries)
+    config.OUTPUT_FORMAT = args.output_format
+    config.CHECKPOINT_EVERY = args.checkpoint_every
     error_logger = ErrorLogger()
     
+    if args.build_index:
+        run_index_build(args)
+        return
+    
+    started = time.perf_counter()
+    run_timer = StageTimer()
+    
     # Load person-verse data
-    person_matcher = PersonVerseMatcher(config.TPERSON_FILE)
-    verse_counter = VerseCounter()
+    with run_timer.stage('load_persons'):
+        person_matcher = open_person_matcher(config)
     
     # Process HTML articles
-    results = []
     article_dir = Path(config.ARTICLE_DIR)
     
     if not article_dir.exists():
         error_logger.log_error("file_not_found", f"Article directory not found: {config.ARTICLE_DIR}")
-        print(f"Error: Article directory not found: {config.ARTICLE_DIR}")
+        logger.error(f"Error: Article directory not found: {config.ARTICLE_DIR}")
         return
     
-    # Search for all .html, .htm, .txt files recursively
-    file_patterns = ["*.htm", "*.html"]
+    article_files = list_article_files(article_dir)
+    # 各檔案在完整清單中的位置，merge 依此還原單機執行的順序
+    file_indexes = list(range(len(article_files)))
+    shard_writer = None
+    if args.shard is not None:
+        shard, shards = args.shard
+        selected = [(position, html_file) for position, html_file in enumerate(article_files)
+                    if shard_of(html_file.relative_to(article_dir).as_posix(), shards) == shard]
+        file_indexes = [position for position, _ in selected]
+        total_files = len(article_files)
+        article_files = [html_file for _, html_file in selected]
+        # 分片各自使用自己的快取與檢查點；彙總報表由 merge 產生
+        config.OUTPUT_FILE = shard_output_file(config.OUTPUT_FILE, shard, shards)
+        config.SUMMARIES = ()
+        shard_writer = ShardResultWriter(partial_file_for(config.OUTPUT_FILE), shard, shards, total_files,
+                                         analysis_fingerprint(config.LANGUAGE))
+    logger.info(f"Processing {len(article_files)} files with {config.WORKERS} worker(s)")
     
-    for pattern in file_patterns:
-        html_files = []
-        print(f"Looking for {pattern} files in {article_dir}")
-        html_files.extend(article_dir.rglob(pattern))
-        print(f"Found {len(html_files)} {pattern} files to process")
-        
-        for html_file in html_files:
-            # Initialize variables for each file
-            extractor = None
-            verses = []
-            verse_counts = {}
-            
-            try:
-                extractor = VerseExtractor(str(html_file))
-                verses = extractor.extract_verses()
-                verse_counts = verse_counter.count_verses(verses)
-                
-                # Find matching persons for each verse
-                for verse, count in verse_counts.items():
-                    matching_persons = person_matcher.find_matching_persons(verse)
-                    # if matching_persons:
-                        # print(f"Found {len(matching_persons)} matching persons for verse: {verse}")
-                    # 取得 book 名稱（以空格分割，取第一個）
-                    book = verse.split(' ', 1)[0] if ' ' in verse else verse
-                    for person in matching_persons:
-                        results.append({
-                            'Verse': verse,
-                            'Book': book,  # 新增欄位
-                            'Count': count,
-                            'PersonID': person['PersonID'],
-                            'PersonName': person['Name'],
-                            'ZhName': person['ZhName'],
-                            'File': str(html_file)
-                        })
-                
-                print(f"Finished processing file: {html_file}, verse_counts: {list(verse_counts.items())[:3]}")
-                # Clear variables after processing each file
-                extractor = None
-                verses = []
-                verse_counts = {}
-                
-                
-            except Exception as e:
-                error_logger.log_error("processing_error", f"Error processing file {html_file}: {str(e)}")
-                print(f"Error processing file {html_file}: {str(e)}")
-                continue
+    cache = None
+    if config.USE_CACHE:
+        cache_file = config.CACHE_FILE or config.OUTPUT_FILE.replace('.csv', '_cache.sqlite')
+        cache = VerseCache(cache_file, analysis_fingerprint(config.LANGUAGE))
     
-    print(f"Total results found: {len(results)}")
+    checkpoint = None
+    resumed: List[Dict] = []
+    if config.CHECKPOINT_EVERY > 0:
+        checkpoint_dir = config.CHECKPOINT_DIR or config.OUTPUT_FILE.replace('.csv', '_checkpoint')
+        checkpoint = RunCheckpoint(checkpoint_dir, analysis_fingerprint(config.LANGUAGE), config.CHECKPOINT_EVERY)
+        if args.resume:
+            resumed = checkpoint.resume([str(html_file) for html_file in article_files])
+        else:
+            checkpoint.reset()
     
-    # Write results to CSV
+    results = chain(replay_checkpoint(resumed),
+                    iter_cached_results(article_files[len(resumed):], config, cache))
+    write_results(args, config, person_matcher, article_files, results, run_timer, started,
+                  checkpoint=checkpoint, resumed=len(resumed), cache=cache,
+                  shard_writer=shard_writer, file_indexes=file_indexes)
+
+
+def run_merge(args: argparse.Namespace) -> None:
+    """
+    Combine shard results into the outputs of a single-node scan
+    """
+    config = config_from_args(args)
+    config.STREAM_OUTPUT = args.stream
+    config.SUMMARIES = tuple(args.summaries)
+    config.OUTPUT_FORMAT = args.output_format
+    error_logger = ErrorLogger()
+    started = time.perf_counter()
+    run_timer = StageTimer()
     try:
-        if results:
-            df = pd.DataFrame(results)
-            df.to_csv(config.OUTPUT_FILE, index=False)
-            print(f"Results written to {config.OUTPUT_FILE}")
-            print(f"Number of rows written: {len(df)}")
-            
-            # 彙總
-            summary = df.groupby(['PersonID', 'PersonName', 'File'], as_index=False)['Count'].sum()
-            summary_file = config.OUTPUT_FILE.replace('.csv', '_summary.csv')
-            summary.to_csv(summary_file, index=False)
-            print(f"Summary written to {summary_file}")
-            print(f"Number of summary rows: {len(summary)}")
-        else:
-            print("No results found to write to CSV")
+        with run_timer.stage('load_persons'):
+            records, person_matcher = load_partial_results(args.partials)
+    except (OSError, ValueError, KeyError) as e:
+        error_logger.log_error("merge_error", f"Error reading shard results: {str(e)}")
+        logger.error(f"Error reading shard results: {str(e)}")
+        return
+    logger.info(f"Merging {len(records)} files from {len(args.partials)} shard result(s)")
+    write_results(args, config, person_matcher, [Path(record['file']) for record in records],
+                  replay_checkpoint(records, 'merged'), run_timer, started)
+
+
+def run_index_build(args: argparse.Namespace) -> None:
+    config = config_from_args(args)
+    error_logger = ErrorLogger()
+    try:
+        build_person_index(config.TPERSON_FILE, config.PERSON_INDEX_FILE)
     except Exception as e:
-        error_logger.log_error("output_error", f"Error writing results: {str(e)}")
-        print(f"Error writing results: {str(e)}")
+        error_logger.log_error("index_error", f"Error building person index: {str(e)}")
+        logger.error(f"Error building person index: {str(e)}")
+
+
+def run_file(args: argparse.Namespace) -> None:
+    """
+    Analyze a single article with the same extraction rules as a scan
+    """
+    config = config_from_args(args)
+    # 先設定錯誤日誌檔，載入人物資料時的錯誤才會寫進去
+    ErrorLogger()
+    if args.json:
+        # 讓 stdout 只有 JSON
+        logger.setLevel(max(logger.level, logging.WARNING))
+    path = Path(args.path)
+    try:
+        data = path.read_bytes()
+    except OSError as e:
+        logger.error(f"Error: {str(e)}")
+        return
+    analyzer = Analyzer(config)
+    html = path.suffix.lower() in ['.html', '.htm']
+    result = next(analyzer.analyze_many([(str(path), data)], html=html))
+    if args.json:
+        rows = [{key: json_value(value) for key, value in row.items()} for row in result.rows]
+        print(json.dumps({'file': result.name, 'verse_counts': result.verse_counts, 'rows': rows,
+                          'error': result.error}, ensure_ascii=False, indent=2))
+        return
+    if result.error is not None:
+        return
+    persons: Dict[str, List[str]] = {}
+    for row in result.rows:
+        persons.setdefault(row['Verse'], []).append(str(csv_value(row['PersonName'])))
+    print(f"{result.name}: {sum(result.verse_counts.values())} verses, {len(result.verse_counts)} unique")
+    for verse, count in result.verse_counts.items():
+        print(f"  {verse:<16} {count:>4}  {', '.join(persons.get(verse, []))}")
+
+
+def run_stats(args: argparse.Namespace) -> None:
+    config = config_from_args(args)
+    if not os.path.exists(config.PERSON_INDEX_FILE):
+        logger.error(f"Person index {config.PERSON_INDEX_FILE} not found; build it with `index build`")
+        return
+    try:
+        stats = person_index_stats(config.PERSON_INDEX_FILE, config.TPERSON_FILE)
+    except (OSError, ValueError) as e:
+        logger.error(f"Error reading person index: {str(e)}")
+        return
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+        return
+    for key, value in stats.items():
+        print(f"{key:<18} {value:.2f}" if isinstance(value, float) else f"{key:<18} {value}")
+    if stats['stale']:
+        print(f"The index was not built from the current {config.TPERSON_FILE}; rebuild it with `index build`")
+
+
+# 子命令 -> 執行函式
+COMMAND_HANDLERS = {
+    'scan': run_analysis,
+    'file': run_file,
+    'index': run_index_build,
+    'stats': run_stats,
+    'merge': run_merge,
+}
+
+
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    setup_console_logging(args.log_level)
+    handler = COMMAND_HANDLERS[args.command]
+    if not args.profile:
+        handler(args)
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(handler, args)
+    finally:
+        profiler.dump_stats(args.profile)
+        logger.info(f"Profile written to {args.profile} (inspect with python -m pstats {args.profile})")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,38 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bible_verse_analyzer import VerseCache, analyze_article  # noqa: E402
+
+
+def write(path: Path, text: str, mtime_ns: int) -> None:
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_cache_hit_after_store(tmp_path):
+    article = tmp_path / 'a.htm'
+    write(article, '<p>約3:16</p>', 1_000_000_000)
+    cache = VerseCache(str(tmp_path / 'cache.sqlite'), 'fingerprint')
+    counts, error, _, signature = analyze_article(str(article), digest=True)
+    assert error is None and signature is not None
+    cache.store(str(article), signature, counts)
+    assert cache.lookup(str(article)) == {'John 3:16': 1}
+    # 只更新 mtime：雜湊相同仍算命中
+    os.utime(article, ns=(2_000_000_000, 2_000_000_000))
+    assert cache.lookup(str(article)) == {'John 3:16': 1}
+    cache.close()
+
+
+def test_cache_rewrite_after_read_is_a_miss(tmp_path):
+    article = tmp_path / 'a.htm'
+    write(article, '<p>約3:16</p>', 1_000_000_000)
+    cache = VerseCache(str(tmp_path / 'cache.sqlite'), 'fingerprint')
+    counts, _, _, signature = analyze_article(str(article), digest=True)
+    # 讀取之後、寫入快取之前檔案被改寫
+    write(article, '<p>約3:17</p>', 2_000_000_000)
+    cache.store(str(article), signature, counts)
+    assert cache.lookup(str(article)) is None
+    cache.close()
@@ -0,0 +1,48 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bible_verse_analyzer import ArticleDecodeError, decode_article  # noqa: E402
+
+BIG5_TEXT = '<p>約翰福音三章16節：神愛世人，甚至將他的獨生子賜給他們。</p>'
+GB_TEXT = '<p>约翰福音三章16节：神爱世人，甚至将他的独生子赐给他们。</p>'
+
+
+def test_decode_utf8():
+    assert decode_article(BIG5_TEXT.encode('utf-8')) == (BIG5_TEXT, 'utf-8')
+
+
+def test_decode_utf8_bom():
+    assert decode_article(b'\xef\xbb\xbf' + BIG5_TEXT.encode('utf-8')) == (BIG5_TEXT, 'utf-8-sig')
+
+
+@pytest.mark.parametrize('text, encoding, charset', [
+    (BIG5_TEXT, 'cp950', 'cp950'),
+    (GB_TEXT, 'gb18030', 'gb18030'),
+])
+def test_decode_undeclared_chinese(text, encoding, charset):
+    assert decode_article(text.encode(encoding)) == (text, charset)
+
+
+def test_decode_declared_charset():
+    data = b'<meta charset="big5">' + BIG5_TEXT.encode('cp950')
+    assert decode_article(data)[1] == 'cp950'
+
+
+@pytest.mark.parametrize('meta, text, encoding, charset', [
+    # 宣告 UTF-8 實為 Big5、宣告 Big5 實為 GB18030：宣告的編碼解不開時改用評分最高的候選
+    (b'<meta charset="utf-8">', BIG5_TEXT, 'cp950', 'cp950'),
+    (b'<meta http-equiv="Content-Type" content="text/html; charset=big5">', GB_TEXT, 'gb18030', 'gb18030'),
+])
+def test_decode_mislabelled_meta(meta, text, encoding, charset):
+    content, used = decode_article(meta + text.encode(encoding))
+    assert used == charset
+    assert content.endswith(text)
+
+
+def test_decode_undecodable():
+    with pytest.raises(ArticleDecodeError):
+        decode_article(b'<p>\x80\x80\xff</p>')
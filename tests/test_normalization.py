@@ -0,0 +1,70 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bible_verse_analyzer import (  # noqa: E402
+    Analyzer, Config, VerseNormalizer, get_normalizer, parse_chinese_numeral,
+)
+
+
+@pytest.mark.parametrize('text, value', [
+    ('三', 3), ('十五', 15), ('一百零三', 103), ('一百二十', 120), ('廿三', 23),
+    ('一一九', 119), ('一○○', 100), ('16', 16), ('abc', None),
+])
+def test_parse_chinese_numeral(text, value):
+    assert parse_chinese_numeral(text) == value
+
+
+@pytest.mark.parametrize('match, keys', [
+    (('約', '3', '16', '-18'), ['John 3:16', 'John 3:17', 'John 3:18']),
+    (('太', '5', '3', ',5,7'), ['Matt 5:3', 'Matt 5:5', 'Matt 5:7']),
+    (('創', '一', '31', '-2:2'), ['Gen 1:31', 'Gen 2:1', 'Gen 2:2']),
+    # 範圍截止於該章最後一節
+    (('約', '三', '35', '-40'), ['John 3:35', 'John 3:36']),
+])
+def test_expand_zh(match, keys):
+    assert list(get_normalizer().expand(*match)) == keys
+
+
+def test_expand_en():
+    assert list(get_normalizer().expand('John', '3', '16', '-18', 'en')) == ['John 3:16', 'John 3:17', 'John 3:18']
+
+
+@pytest.mark.parametrize('match', [(' at', '1', '1', '-1:2000000'), (' at', '10', '30', '-11:45'), (' score', '3', '1', ', 2')])
+def test_expand_unknown_book_is_not_expanded(match):
+    assert len(list(get_normalizer().expand(*match, language='en'))) == 1
+
+
+def test_normalizer_caches_are_bounded():
+    normalizer = VerseNormalizer(cache_size=10)
+    for i in range(100):
+        assert normalizer.resolve_book(f" word{i}") == f"word{i}"
+        assert normalizer.resolve_chapter(str(i)) == str(i)
+    assert len(normalizer._book_cache) == 0
+    assert len(normalizer._chapter_cache) == 10
+    assert normalizer.resolve_book('約翰福音') == 'John'
+    assert normalizer.resolve_chapter('一百一十九') == '119'
+
+
+class NoPersons:
+    def find_matching_persons(self, verse):
+        return []
+
+
+def test_analyze_text_en_ignores_clock_ranges():
+    analyzer = Analyzer(Config(LANGUAGE='en'), person_matcher=NoPersons())
+    result = analyzer.analyze_text("The meeting ran at 1:1-1:2000000 today, see John 3:16-17")
+    assert result.verse_counts == {'at 1:1': 1, 'John 3:16': 1, 'John 3:17': 1}
+
+
+def test_analyzer_uses_the_instance_pattern():
+    text = "見約3:16與太5:3"
+    default = Analyzer(Config(), person_matcher=NoPersons())
+    custom = Analyzer(Config(VERSE_PATTERN_ZH=r"(約)(\d+):(\d+)()"), person_matcher=NoPersons())
+    assert default.analyze_text(text).verse_counts == {'John 3:16': 1, 'Matt 5:3': 1}
+    assert custom.analyze_text(text).verse_counts == {'John 3:16': 1}
+    # 兩個設定不同的實例可以並存
+    assert default.analyze_text(text).verse_counts == {'John 3:16': 1, 'Matt 5:3': 1}
@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bible_verse_analyzer import (  # noqa: E402
+    MmapPersonVerseMatcher, PersonVerseMatcher, build_person_index, verse_id,
+)
+
+TPERSON = '''PersonID,Name,ZhName,Verses
+1,Adam,亞當,Gen 1:1;Gen 2:7
+2,Eve,夏娃,Gen 01:2;Gen 2:7
+3,Moses,摩西,Exod 3:4;Deut 0:1
+'''
+
+
+@pytest.fixture(scope='module')
+def matchers(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('persons')
+    tperson = directory / 'tPerson.csv'
+    tperson.write_text(TPERSON, encoding='utf-8')
+    index = directory / 'tPerson.bvidx'
+    build_person_index(str(tperson), str(index))
+    return PersonVerseMatcher(str(tperson)), MmapPersonVerseMatcher(str(index))
+
+
+def test_verse_id_rejects_leading_zeros():
+    assert verse_id('Gen 1:1') is not None
+    assert verse_id('Gen 01:1') is None
+    assert verse_id('Gen 1:01') is None
+    assert verse_id('Gen 0:1') is None
+
+
+@pytest.mark.parametrize('verse', [
+    'Gen 1:1', 'Gen 01:1', 'Gen 1:01', 'Gen 1:2', 'Gen 01:2', 'Gen 2:7', 'Exod 3:4', 'Deut 0:1', 'Deut 1:1',
+])
+def test_csv_and_index_backends_agree(matchers, verse):
+    csv_matcher, index_matcher = matchers
+    names = [person['Name'] for person in csv_matcher.find_matching_persons(verse)]
+    assert [person['Name'] for person in index_matcher.find_matching_persons(verse)] == names
@@ -0,0 +1,114 @@
+"""
+Scan modes that promise the same outputs as a serial run, checked byte for byte
+against it on a small synthetic corpus (benchmarks/corpus.py)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / 'benchmarks'))
+
+import bible_verse_analyzer  # noqa: E402
+from bible_verse_analyzer import main, partial_file_for, shard_output_file  # noqa: E402
+from corpus import generate_corpus, generate_tperson  # noqa: E402
+
+ARTICLES = 40
+
+
+@pytest.fixture(scope='module')
+def corpus(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('corpus')
+    generate_corpus(directory / 'article', ARTICLES, chars=3000, density=8.0, seed=1)
+    generate_tperson(directory / 'tPerson.csv', persons=300, seed=1)
+    return directory
+
+
+def scan(corpus: Path, output: Path, *options: str) -> Path:
+    main(['scan', '--article-dir', str(corpus / 'article'), '--tperson', str(corpus / 'tPerson.csv'),
+          '--person-index', str(corpus / 'missing.bvidx'), '--output', str(output),
+          '--no-cache', '--log-level', 'WARNING', *options])
+    return output
+
+
+def outputs(output: Path):
+    """
+    Returns: the bytes of the detail CSV and the person summary CSV
+    """
+    return output.read_bytes(), output.with_name(output.stem + '_summary.csv').read_bytes()
+
+
+@pytest.fixture(scope='module')
+def serial(corpus, tmp_path_factory):
+    output = scan(corpus, tmp_path_factory.mktemp('serial') / 'result.csv', '--workers', '1')
+    detail, summary = outputs(output)
+    assert detail.count(b'\n') > ARTICLES
+    return detail, summary
+
+
+@pytest.mark.parametrize('workers', ['2', '3'])
+def test_workers_match_serial(corpus, serial, tmp_path, workers):
+    assert outputs(scan(corpus, tmp_path / 'result.csv', '--workers', workers)) == serial
+
+
+@pytest.mark.parametrize('options', [['--prefetch', '4'], ['--prefetch', '1', '--workers', '3']])
+def test_prefetch_matches_serial(corpus, serial, tmp_path, options):
+    assert outputs(scan(corpus, tmp_path / 'result.csv', *options)) == serial
+
+
+@pytest.mark.parametrize('options', [['--stream'], ['--stream', '--workers', '2']])
+def test_stream_matches_serial(corpus, serial, tmp_path, options):
+    assert outputs(scan(corpus, tmp_path / 'result.csv', *options)) == serial
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_resume_after_interrupt_matches_serial(corpus, serial, tmp_path, monkeypatch, workers):
+    flush = bible_verse_analyzer.RunCheckpoint.flush
+    interrupted = []
+
+    def flush_then_interrupt(checkpoint):
+        flush(checkpoint)
+        # 第二個檢查點寫出後中斷，模擬在掃描中途被終止
+        if len(checkpoint.segments) == 2 and not interrupted:
+            interrupted.append(checkpoint.completed)
+            raise KeyboardInterrupt
+
+    output = tmp_path / 'result.csv'
+    monkeypatch.setattr(bible_verse_analyzer.RunCheckpoint, 'flush', flush_then_interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        scan(corpus, output, '--checkpoint-every', '7', '--workers', workers)
+    monkeypatch.undo()
+    assert interrupted == [14]
+    assert (tmp_path / 'result_checkpoint' / 'manifest.json').exists()
+
+    replay = bible_verse_analyzer.replay_checkpoint
+    replayed = []
+
+    def counting_replay(records, *args):
+        replayed.append(len(records))
+        return replay(records, *args)
+
+    monkeypatch.setattr(bible_verse_analyzer, 'replay_checkpoint', counting_replay)
+    assert outputs(scan(corpus, output, '--checkpoint-every', '7', '--workers', workers, '--resume')) == serial
+    assert replayed == [14]
+    assert not (tmp_path / 'result_checkpoint').exists()
+
+
+def test_resume_without_checkpoints_is_rejected(corpus, tmp_path):
+    with pytest.raises(SystemExit):
+        scan(corpus, tmp_path / 'result.csv', '--resume', '--checkpoint-every', '0')
+    assert not (tmp_path / 'result.csv').exists()
+
+
+@pytest.mark.parametrize('order', [(2, 0, 1), (1, 2, 0), (2, 1, 0)])
+def test_merged_shards_match_serial(corpus, serial, tmp_path, order):
+    output = str(tmp_path / 'result.csv')
+    for shard in range(len(order)):
+        scan(corpus, Path(output), '--shard', f"{shard}/{len(order)}")
+    # 分片結果以打亂的順序交給 merge
+    partials = [partial_file_for(shard_output_file(output, shard, len(order))) for shard in order]
+    merged = tmp_path / 'merged.csv'
+    main(['merge', *partials, '--output', str(merged), '--log-level', 'WARNING'])
+    assert outputs(merged) == serial
@@ -0,0 +1,74 @@
+import http.client
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bible_verse_analyzer import Config  # noqa: E402
+from verse_service import create_server  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def service(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('service')
+    tperson = directory / 'tPerson.csv'
+    tperson.write_text('PersonID,Name,ZhName,Verses\n1,Nicodemus,尼哥底母,John 3:16;John 3:1\n', encoding='utf-8')
+    config = Config(TPERSON_FILE=str(tperson), PERSON_INDEX_FILE=str(directory / 'missing.bvidx'),
+                    SERVICE_PORT=0, SERVICE_WORKERS=0, BATCH_WAIT_MS=0, SERVICE_MAX_BODY_BYTES=1024)
+    server = create_server(config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[:2]
+    server.shutdown()
+    server.server_close()
+    server.executor.shutdown()
+
+
+def post(address, body: bytes, headers=None):
+    """
+    Returns: (status, decoded JSON body)
+    """
+    connection = http.client.HTTPConnection(*address, timeout=10)
+    connection.putrequest('POST', '/analyze?name=a.htm')
+    if headers is None:
+        headers = {'Content-Length': str(len(body))}
+    for key, value in headers.items():
+        connection.putheader(key, value)
+    connection.endheaders()
+    connection.send(body)
+    response = connection.getresponse()
+    result = response.status, json.loads(response.read())
+    connection.close()
+    return result
+
+
+def test_analyze_ok(service):
+    status, result = post(service, '<p>約3:16</p>'.encode('utf-8'))
+    assert status == 200
+    assert result['verse_counts'] == {'John 3:16': 1}
+    assert [row['PersonName'] for row in result['rows']] == ['Nicodemus']
+
+
+@pytest.mark.parametrize('length', ['abc', '-1', ''])
+def test_invalid_content_length(service, length):
+    headers = {'Content-Length': length} if length else {}
+    status, result = post(service, b'', headers)
+    assert status == 400
+    assert 'Content-Length' in result['error']
+
+
+def test_body_too_large(service):
+    status, result = post(service, b'x' * 2048)
+    assert status == 413
+    # 服務仍可繼續處理請求
+    assert post(service, '<p>約3:16</p>'.encode('utf-8'))[0] == 200
+
+
+def test_undecodable_document(service):
+    status, result = post(service, b'<p>\x80\x80\xff</p>')
+    assert status == 422
+    assert result['name'] == 'a.htm' and 'error' in result
@@ -0,0 +1,313 @@
+"""
+Long-running local HTTP service for verse/person tagging
+
+Keeps an Analyzer (person index, compiled patterns, normalization tables)
+warm in every worker and micro-batches concurrent requests onto the
+worker pool. Standard library only.
+
+    python verse_service.py [--port 8765] [--workers 2] [--batch-size 32] [--batch-wait-ms 5]
+
+Endpoints:
+    POST /analyze   body = HTML (default) or plain text (Content-Type: text/plain
+                    or ?format=text); optional ?name=... is echoed back as File
+                    Returns: {"name", "verse_counts", "rows"}; 400 for a bad
+                    Content-Length, 413 above --max-body-bytes, 422 if the
+                    document cannot be analyzed
+    GET  /stats     request, batch and latency (p50/p90/p99) counters, throughput
+    GET  /health    "ok" once the workers are warm
+"""
+import argparse
+import json
+import queue
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from bible_verse_analyzer import Analyzer, Config, json_value, logger, setup_console_logging
+
+# 每個工作行程中常駐的分析器，由 init_worker 建立
+_worker_analyzer: Optional[Analyzer] = None
+
+# 一份待分析文件：(name, body, 是否為 HTML)
+Document = Tuple[str, bytes, bool]
+
+
+def init_worker(config_fields: Dict) -> None:
+    global _worker_analyzer
+    _worker_analyzer = Analyzer(Config(**config_fields))
+
+
+def analyze_batch(documents: List[Document]) -> List[Dict]:
+    """
+    Analyze a micro-batch in a worker with its warm Analyzer
+    Returns: one JSON-ready result (or {"error": ...}) per document, in order
+    """
+    results = []
+    for name, body, html in documents:
+        try:
+            if html:
+                result = _worker_analyzer.analyze_html(body, name)
+            else:
+                result = _worker_analyzer.analyze_text(_worker_analyzer.extractor.decode(body), name)
+        except Exception as e:
+            results.append({'name': name, 'error': str(e)})
+            continue
+        results.append({
+            'name': name,
+            'verse_counts': result.verse_counts,
+            'rows': [{key: json_value(value) for key, value in row.items()} for row in result.rows],
+        })
+    return results
+
+
+class ServiceStats:
+    """
+    Thread-safe request counters and a window of recent latencies
+    """
+    def __init__(self, window: int = 10000):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.bytes = 0
+        self.batches = 0
+        self.batched_documents = 0
+        # (完成時間, 延遲秒數)
+        self.recent: deque = deque(maxlen=window)
+
+    def record_request(self, latency: float, size: int, error: bool) -> None:
+        with self.lock:
+            self.requests += 1
+            self.errors += error
+            self.bytes += size
+            self.recent.append((time.time(), latency))
+
+    def record_batch(self, size: int) -> None:
+        with self.lock:
+            self.batches += 1
+            self.batched_documents += size
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            now = time.time()
+            latencies = sorted(latency for _, latency in self.recent)
+            last_minute = sum(1 for finished, _ in self.recent if finished >= now - 60)
+            uptime = now - self.started
+
+            def percentile(q: float) -> Optional[float]:
+                if not latencies:
+                    return None
+                return latencies[min(len(latencies) - 1, int(q / 100 * len(latencies)))] * 1000
+
+            return {
+                'uptime_seconds': uptime,
+                'requests': self.requests,
+                'errors': self.errors,
+                'bytes': self.bytes,
+                'batches': self.batches,
+                'mean_batch_size': self.batched_documents / self.batches if self.batches else 0.0,
+                'requests_per_second': self.requests / uptime if uptime > 0 else 0.0,
+                'requests_per_second_last_minute': last_minute / min(60.0, uptime) if uptime > 0 else 0.0,
+                'latency_ms': {'p50': percentile(50), 'p90': percentile(90), 'p99': percentile(99),
+                               'max': latencies[-1] * 1000 if latencies else None,
+                               'window': len(latencies)},
+            }
+
+
+class MicroBatcher:
+    """
+    Collect concurrent requests into batches for the worker pool
+    A batch is dispatched when it holds batch_size documents or batch_wait
+    seconds after its first document arrived, whichever comes first; batches
+    are submitted without waiting for earlier ones, so all workers stay busy
+    """
+    def __init__(self, executor, stats: ServiceStats, batch_size: int, batch_wait: float):
+        self.executor = executor
+        self.stats = stats
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.queue: "queue.Queue[Tuple[Document, Future]]" = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self.thread.start()
+
+    def submit(self, document: Document) -> Future:
+        future = Future()
+        self.queue.put((document, future))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.stats.record_batch(len(batch))
+            futures = [future for _, future in batch]
+            try:
+                submitted = self.executor.submit(analyze_batch, [document for document, _ in batch])
+            except Exception as e:
+                for future in futures:
+                    future.set_exception(e)
+                continue
+            submitted.add_done_callback(lambda done, futures=futures: self._resolve(done, futures))
+
+    @staticmethod
+    def _resolve(done: Future, futures: List[Future]) -> None:
+        error = done.exception()
+        if error is not None:
+            for future in futures:
+                future.set_exception(error)
+            return
+        for future, result in zip(futures, done.result()):
+            future.set_result(result)
+
+
+class VerseServiceHandler(BaseHTTPRequestHandler):
+    server_version = "VerseService/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status: int, payload, close: bool = False) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if close:
+            # 未讀取的請求本文仍留在連線上，不能再接著處理下一個請求
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path == '/stats':
+            stats = self.server.stats.snapshot()
+            stats['config'] = self.server.settings
+            self._send_json(200, stats)
+        elif path == '/health':
+            self._send_json(200, 'ok')
+        else:
+            self._send_json(404, {'error': f"unknown path {path}"})
+
+    def do_POST(self) -> None:
+        started = time.perf_counter()
+        url = urlparse(self.path)
+        if url.path != '/analyze':
+            self._send_json(404, {'error': f"unknown path {url.path}"})
+            return
+        query = parse_qs(url.query)
+        declared = self.headers.get('Content-Length')
+        try:
+            length = int(declared)
+            if length < 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            self._send_json(400, {'error': f"invalid Content-Length: {declared}"}, close=True)
+            self.server.stats.record_request(time.perf_counter() - started, 0, True)
+            return
+        if length > self.server.max_body_bytes:
+            self._send_json(413, {'error': f"body of {length} bytes exceeds the limit of "
+                                           f"{self.server.max_body_bytes} bytes"}, close=True)
+            self.server.stats.record_request(time.perf_counter() - started, 0, True)
+            return
+        body = self.rfile.read(length)
+        content_type = self.headers.get('Content-Type', '')
+        html = query.get('format', ['html'])[0] != 'text' and not content_type.startswith('text/plain')
+        name = query.get('name', [''])[0]
+        try:
+            result = self.server.batcher.submit((name, body, html)).result(timeout=self.server.timeout_seconds)
+            status = 422 if 'error' in result else 200
+        except Exception as e:
+            result, status = {'name': name, 'error': str(e)}, 500
+        self._send_json(status, result)
+        self.server.stats.record_request(time.perf_counter() - started, len(body), status != 200)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(config: Config, timeout_seconds: float = 60.0) -> ThreadingHTTPServer:
+    """
+    Start the worker pool (warming one Analyzer per worker) and bind the server
+    SERVICE_WORKERS = 0 analyzes on a single thread inside the service process
+    """
+    config_fields = asdict(config)
+    if config.SERVICE_WORKERS > 0:
+        executor = ProcessPoolExecutor(max_workers=config.SERVICE_WORKERS,
+                                       initializer=init_worker, initargs=(config_fields,))
+    else:
+        executor = ThreadPoolExecutor(max_workers=1, initializer=init_worker, initargs=(config_fields,))
+    # 預先送出一批空文件，讓每個工作行程在接受請求前就載入好索引
+    warmups = [executor.submit(analyze_batch, []) for _ in range(max(1, config.SERVICE_WORKERS))]
+    for warmup in warmups:
+        warmup.result()
+    server = ThreadingHTTPServer((config.SERVICE_HOST, config.SERVICE_PORT), VerseServiceHandler)
+    server.daemon_threads = True
+    server.executor = executor
+    server.stats = ServiceStats()
+    server.batcher = MicroBatcher(executor, server.stats, config.BATCH_SIZE, config.BATCH_WAIT_MS / 1000)
+    server.timeout_seconds = timeout_seconds
+    server.max_body_bytes = config.SERVICE_MAX_BODY_BYTES
+    server.settings = {key: config_fields[key] for key in
+                       ('LANGUAGE', 'TEXT_BACKEND', 'ZH_MATCHER', 'SERVICE_WORKERS', 'BATCH_SIZE', 'BATCH_WAIT_MS',
+                        'SERVICE_MAX_BODY_BYTES')}
+    return server
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve verse/person tagging over HTTP")
+    parser.add_argument("--host", default=Config.SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=Config.SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=Config.SERVICE_WORKERS,
+                        help="analysis processes (default: %(default)s, 0 = analyze in the service process)")
+    parser.add_argument("--batch-size", type=int, default=Config.BATCH_SIZE,
+                        help="maximum documents per micro-batch (default: %(default)s)")
+    parser.add_argument("--batch-wait-ms", type=float, default=Config.BATCH_WAIT_MS,
+                        help="how long a batch waits for more requests (default: %(default)s)")
+    parser.add_argument("--max-body-bytes", type=int, default=Config.SERVICE_MAX_BODY_BYTES,
+                        help="largest accepted request body; larger ones get 413 (default: %(default)s)")
+    parser.add_argument("--tperson", default=Config.TPERSON_FILE, help="tPerson.csv to match against")
+    parser.add_argument("--index", default=Config.PERSON_INDEX_FILE, help="prebuilt person index (see --build-index)")
+    parser.add_argument("--language", default=Config.LANGUAGE, choices=["zh", "en"])
+    parser.add_argument("--log-level", default=Config.LOG_LEVEL, choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    setup_console_logging(args.log_level)
+    config = Config(TPERSON_FILE=args.tperson, PERSON_INDEX_FILE=args.index, LANGUAGE=args.language,
+                    SERVICE_HOST=args.host, SERVICE_PORT=args.port, SERVICE_WORKERS=args.workers,
+                    BATCH_SIZE=args.batch_size, BATCH_WAIT_MS=args.batch_wait_ms,
+                    SERVICE_MAX_BODY_BYTES=args.max_body_bytes)
+    server = create_server(config)
+    host, port = server.server_address[:2]
+    logger.info(f"Verse service listening on http://{host}:{port} "
+                f"({config.SERVICE_WORKERS} worker(s), batches of up to {config.BATCH_SIZE})")
+    sys.stdout.flush()
+    # SIGTERM 與 Ctrl+C 相同處理，確保工作行程一併結束
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()